@@ -90,6 +90,20 @@ class Settings(BaseSettings):
         description="H3 resolution for statistical analysis (25km grid)"
     )
     
+    # Microsoft Planetary Computer raster reads
+    MPC_PARALLEL_READS: bool = Field(
+        default=True,
+        description="Read large COG windows block-by-block on a thread pool"
+    )
+    MPC_PARALLEL_READ_MIN_BLOCKS: int = Field(
+        default=4,
+        description="Minimum internal blocks in a window before reads are parallelized"
+    )
+    MPC_READ_WORKERS: int = Field(
+        default=8,
+        description="Maximum threads used for parallel COG block reads"
+    )
+    
     # Cache Settings
     CACHE_TTL: int = Field(
         default=3600,
@@ -4,7 +4,9 @@ H3 indexing, coordinate conversion, spatial queries, fire-forest correlation
 """
 
 from typing import List, Tuple, Optional, Dict, Set
+import warnings
 import h3
+import numpy as np
 from shapely.geometry import Point, Polygon, box
 from shapely.ops import transform
 import pyproj
@@ -13,8 +15,22 @@ from functools import lru_cache
 from app.schemas.common import BoundingBox
 from app.utils.logger import get_logger
 
+# Array-at-a-time H3 (h3-py 3.7+); the module warns that it's experimental
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        from h3.unstable import vect as h3_vect
+    H3_VECT_AVAILABLE = True
+except ImportError:
+    H3_VECT_AVAILABLE = False
+
 logger = get_logger(__name__)
 
+EARTH_RADIUS_KM = 6371.0
+
+# h3 v4 renamed geo_to_h3 -> latlng_to_cell; resolve once at import
+_latlng_to_cell = h3.latlng_to_cell if hasattr(h3, 'latlng_to_cell') else h3.geo_to_h3
+
 
 class SpatialOps:
     """Spatial operations using H3 hexagonal indexing."""
@@ -22,9 +38,22 @@ class SpatialOps:
     @staticmethod
     def lat_lon_to_h3(lat: float, lon: float, resolution: int) -> str:
         """Convert lat/lon to H3 index."""
-        if hasattr(h3, 'latlng_to_cell'):
-            return h3.latlng_to_cell(lat, lon, resolution)
-        return h3.geo_to_h3(lat, lon, resolution)
+        return _latlng_to_cell(lat, lon, resolution)
+    
+    @staticmethod
+    def lat_lon_to_h3_vec(lats: np.ndarray, lons: np.ndarray, resolution: int) -> np.ndarray:
+        """Convert arrays of lat/lon to H3 indexes (same strings as lat_lon_to_h3)."""
+        lats = np.ascontiguousarray(lats, dtype=np.float64)
+        lons = np.ascontiguousarray(lons, dtype=np.float64)
+        
+        if H3_VECT_AVAILABLE:
+            cells = h3_vect.geo_to_h3(lats, lons, resolution)
+            return np.array([format(cell, 'x') for cell in cells.tolist()], dtype=object)
+        
+        return np.array([
+            SpatialOps.lat_lon_to_h3(lat, lon, resolution)
+            for lat, lon in zip(lats.tolist(), lons.tolist())
+        ], dtype=object)
     
     @staticmethod
     def h3_to_lat_lon(h3_index: str) -> Tuple[float, float]:
@@ -81,7 +110,7 @@ class SpatialOps:
         """Calculate distance in km using Haversine formula."""
         from math import radians, sin, cos, sqrt, atan2
         
-        R = 6371.0
+        R = EARTH_RADIUS_KM
         lat1_rad, lon1_rad = radians(lat1), radians(lon1)
         lat2_rad, lon2_rad = radians(lat2), radians(lon2)
         
@@ -93,6 +122,17 @@ class SpatialOps:
         
         return R * c
     
+    @staticmethod
+    def haversine_distance_vec(lat1, lon1, lat2, lon2) -> np.ndarray:
+        """Haversine distance in km between arrays of points (broadcasts)."""
+        lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64))
+                                  for v in (lat1, lon1, lat2, lon2))
+        
+        a = (np.sin((lat2 - lat1) / 2) ** 2
+             + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+        
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+    
     @staticmethod
     @lru_cache(maxsize=1024)
     def get_h3_area_km2(resolution: int) -> float:
@@ -6,6 +6,7 @@ import logging
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import StaticPool
 from app.config import settings
 
 # Get logger
@@ -38,12 +39,19 @@ class DatabaseManager:
             if not self.database_url.startswith("sqlite+aiosqlite"):
                 self.database_url = "sqlite+aiosqlite:///./geowise.db"
             
+            # In-memory databases live and die with their connection: share
+            # a single one so every session (and create_tables) sees the same DB
+            engine_kwargs = {}
+            if ":memory:" in self.database_url:
+                engine_kwargs["poolclass"] = StaticPool
+            
             # Create async engine for SQLite
             self.engine = create_async_engine(
                 self.database_url,
                 echo=settings.DEBUG,
                 future=True,
-                connect_args={"check_same_thread": False}  # Required for async SQLite
+                connect_args={"check_same_thread": False},  # Required for async SQLite
+                **engine_kwargs
             )
             
             # Create async session factory
@@ -89,6 +97,33 @@ class DatabaseManager:
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables created successfully")
+    
+    async def upgrade_schema(self) -> None:
+        """
+        Apply additive column changes that create_all() cannot make.
+        
+        create_all() skips tables that already exist, so databases created
+        before fire_detections.year was added get the column (and its
+        backfill from acq_date) here. Safe to run on every startup.
+        """
+        async with self.engine.begin() as conn:
+            result = await conn.exec_driver_sql("PRAGMA table_info(fire_detections)")
+            columns = {row[1] for row in result.fetchall()}
+            
+            if columns and "year" not in columns:
+                await conn.exec_driver_sql(
+                    "ALTER TABLE fire_detections ADD COLUMN year INTEGER"
+                )
+                await conn.exec_driver_sql(
+                    "UPDATE fire_detections "
+                    "SET year = CAST(strftime('%Y', acq_date) AS INTEGER) "
+                    "WHERE acq_date IS NOT NULL"
+                )
+                await conn.exec_driver_sql(
+                    "CREATE INDEX IF NOT EXISTS idx_fires_country_acq_year "
+                    "ON fire_detections (country, year)"
+                )
+                logger.info("✅ Added and backfilled fire_detections.year")
 
 
 # Global database instance
@@ -110,6 +145,8 @@ async def init_db() -> None:
     # Create tables in development
     if settings.ENVIRONMENT == "development":
         await database_manager.create_tables()
+    
+    await database_manager.upgrade_schema()
 
 
 async def close_db() -> None:
@@ -1,6 +1,7 @@
 """LLM Orchestrator - Main AI Controller (v5.2 - Fixed)"""
 
 from typing import Dict, Any, Optional
+import asyncio
 from datetime import date, datetime
 import pandas as pd
 from scipy.stats import pearsonr
@@ -608,102 +609,100 @@ class LLMOrchestrator:
             if year and year < 2025:
                 logger.info(f"Historical query branch: {country_iso} {year}")
                 
-                async with database_manager.async_session_maker() as session:
-                    logger.info("Session created successfully")
-                    
-                    query_sql = """
-                        SELECT COUNT(*) 
-                        FROM fire_detections 
-                        WHERE country = :country 
-                        AND strftime('%Y', acq_date) = :year
-                    """
-                    params = {"country": country_iso, "year": str(year)}
-                    
-                    logger.info(f"Executing query with params: {params}")
-                    
-                    result = await session.execute(text(query_sql), params)
-                    total_fires = result.scalar()
-                    
-                    logger.info(f"!!! RESULT: {total_fires} fires !!!")
-                    
-                    if total_fires is None or total_fires == 0:
-                        logger.error(f"Zero or None fires returned!")
-                        await session.commit()
-                        return {
-                            "status": "error",
-                            "message": f"No fires found for {country_iso} in {year}"
-                        }
-                    
-                    logger.info(f"Proceeding to get sample fires...")
-                    
-                    result = await session.execute(
-                        text("""
-                            SELECT latitude, longitude, frp, confidence, acq_date, brightness
-                            FROM fire_detections 
-                            WHERE country = :country 
-                            AND strftime('%Y', acq_date) = :year
-                            LIMIT 10
-                        """),
-                        {"country": country_iso, "year": str(year)}
-                    )
-                    sample_fires = result.fetchall()
-                    logger.info(f"Got {len(sample_fires)} sample fires")
-                    
-                    result = await session.execute(
-                        text("""
-                            SELECT 
-                                AVG(frp) as avg_frp,
-                                MAX(frp) as max_frp,
-                                AVG(brightness) as avg_brightness,
-                                MIN(acq_date) as min_date,
-                                MAX(acq_date) as max_date,
-                                COUNT(DISTINCT strftime('%m', acq_date)) as months_with_fires
-                            FROM fire_detections 
-                            WHERE country = :country 
-                            AND strftime('%Y', acq_date) = :year
-                        """),
-                        {"country": country_iso, "year": str(year)}
-                    )
-                    stats = result.fetchone()
-                    logger.info(f"Got stats: {stats}")
-                    
-                    await session.commit()
-                    logger.info("Session committed")
-                    
-                    result_data = {
-                        "status": "success",
-                        "intent": "query_fires",
-                        "data": {
-                            "country": country_iso,
-                            "year": year,
-                            "fire_count": total_fires,
-                            "data_source": "historical_database",
-                            "statistics": {
-                                "avg_frp": round(stats[0], 2) if stats[0] else 0,
-                                "max_frp": round(stats[1], 2) if stats[1] else 0,
-                                "avg_brightness": round(stats[2], 2) if stats[2] else 0,
-                                "date_range": {
-                                    "start": str(stats[3]) if stats[3] else None,
-                                    "end": str(stats[4]) if stats[4] else None
-                                },
-                                "months_with_fires": stats[5] if stats[5] else 0
+                params = {"country": country_iso, "year_start": f"{year}-01-01", "year_end": f"{int(year) + 1}-01-01"}
+                
+                count_sql = """
+                    SELECT COUNT(*) 
+                    FROM fire_detections 
+                    WHERE country = :country 
+                    AND acq_date >= :year_start
+                    AND acq_date < :year_end
+                """
+                
+                sample_sql = """
+                    SELECT latitude, longitude, frp, confidence, acq_date, brightness
+                    FROM fire_detections 
+                    WHERE country = :country 
+                    AND acq_date >= :year_start
+                    AND acq_date < :year_end
+                    LIMIT 10
+                """
+                
+                stats_sql = """
+                    SELECT 
+                        AVG(frp) as avg_frp,
+                        MAX(frp) as max_frp,
+                        AVG(brightness) as avg_brightness,
+                        MIN(acq_date) as min_date,
+                        MAX(acq_date) as max_date,
+                        COUNT(DISTINCT strftime('%m', acq_date)) as months_with_fires
+                    FROM fire_detections 
+                    WHERE country = :country 
+                    AND acq_date >= :year_start
+                    AND acq_date < :year_end
+                """
+                
+                # The three reads are independent; give each its own pooled
+                # connection so they run side by side instead of back to back
+                async def probe(sql, fetch):
+                    async with database_manager.async_session_maker() as session:
+                        result = await session.execute(text(sql), params)
+                        return fetch(result)
+                
+                logger.info(f"Executing queries with params: {params}")
+                
+                total_fires, sample_fires, stats = await asyncio.gather(
+                    probe(count_sql, lambda r: r.scalar()),
+                    probe(sample_sql, lambda r: r.fetchall()),
+                    probe(stats_sql, lambda r: r.fetchone()),
+                )
+                
+                logger.info(f"!!! RESULT: {total_fires} fires !!!")
+                
+                if total_fires is None or total_fires == 0:
+                    logger.error(f"Zero or None fires returned!")
+                    return {
+                        "status": "error",
+                        "message": f"No fires found for {country_iso} in {year}"
+                    }
+                
+                logger.info(f"Got {len(sample_fires)} sample fires")
+                logger.info(f"Got stats: {stats}")
+                
+                result_data = {
+                    "status": "success",
+                    "intent": "query_fires",
+                    "data": {
+                        "country": country_iso,
+                        "year": year,
+                        "fire_count": total_fires,
+                        "data_source": "historical_database",
+                        "statistics": {
+                            "avg_frp": round(stats[0], 2) if stats[0] else 0,
+                            "max_frp": round(stats[1], 2) if stats[1] else 0,
+                            "avg_brightness": round(stats[2], 2) if stats[2] else 0,
+                            "date_range": {
+                                "start": str(stats[3]) if stats[3] else None,
+                                "end": str(stats[4]) if stats[4] else None
                             },
-                            "sample_fires": [
-                                {
-                                    "latitude": float(f[0]),
-                                    "longitude": float(f[1]),
-                                    "frp": float(f[2]) if f[2] else 0,
-                                    "confidence": f[3],
-                                    "date": str(f[4]),
-                                    "brightness": float(f[5]) if f[5] else 0
-                                }
-                                for f in sample_fires
-                            ]
-                        }
+                            "months_with_fires": stats[5] if stats[5] else 0
+                        },
+                        "sample_fires": [
+                            {
+                                "latitude": float(f[0]),
+                                "longitude": float(f[1]),
+                                "frp": float(f[2]) if f[2] else 0,
+                                "confidence": f[3],
+                                "date": str(f[4]),
+                                "brightness": float(f[5]) if f[5] else 0
+                            }
+                            for f in sample_fires
+                        ]
                     }
-                    
-                    logger.info(f"✅ Returning successful result with {total_fires} fires")
-                    return result_data
+                }
+                
+                logger.info(f"✅ Returning successful result with {total_fires} fires")
+                return result_data
                     
             else:
                 logger.info("Real-time query branch")
@@ -771,14 +770,15 @@ class LLMOrchestrator:
                         AVG(brightness) as avg_brightness
                     FROM fire_detections
                     WHERE country = :country
-                    AND strftime('%Y', acq_date) = :year
+                    AND acq_date >= :year_start
+                    AND acq_date < :year_end
                     GROUP BY strftime('%m', acq_date)
                     ORDER BY strftime('%m', acq_date)
                 """
                 
                 result = await session.execute(
                     text(query_sql),
-                    {"country": country_iso, "year": str(year)}
+                    {"country": country_iso, "year_start": f"{year}-01-01", "year_end": f"{int(year) + 1}-01-01"}
                 )
                 monthly_data = result.fetchall()
                 
@@ -858,13 +858,14 @@ class LLMOrchestrator:
                     SELECT COUNT(*)
                     FROM fire_detections
                     WHERE country = :country
-                    AND strftime('%Y', acq_date) = :year
+                    AND acq_date >= :year_start
+                    AND acq_date < :year_end
                     AND frp >= :min_frp
                 """
                 
                 result = await session.execute(
                     text(count_sql),
-                    {"country": country_iso, "year": str(year), "min_frp": min_frp}
+                    {"country": country_iso, "year_start": f"{year}-01-01", "year_end": f"{int(year) + 1}-01-01", "min_frp": min_frp}
                 )
                 high_frp_count = result.scalar()
                 
@@ -879,7 +880,8 @@ class LLMOrchestrator:
                         satellite
                     FROM fire_detections
                     WHERE country = :country
-                    AND strftime('%Y', acq_date) = :year
+                    AND acq_date >= :year_start
+                    AND acq_date < :year_end
                     AND frp >= :min_frp
                     ORDER BY frp DESC
                     LIMIT 20
@@ -887,7 +889,7 @@ class LLMOrchestrator:
                 
                 result = await session.execute(
                     text(top_fires_sql),
-                    {"country": country_iso, "year": str(year), "min_frp": min_frp}
+                    {"country": country_iso, "year_start": f"{year}-01-01", "year_end": f"{int(year) + 1}-01-01", "min_frp": min_frp}
                 )
                 top_fires = result.fetchall()
                 
@@ -898,13 +900,14 @@ class LLMOrchestrator:
                         MIN(frp) as min_frp
                     FROM fire_detections
                     WHERE country = :country
-                    AND strftime('%Y', acq_date) = :year
+                    AND acq_date >= :year_start
+                    AND acq_date < :year_end
                     AND frp >= :min_frp
                 """
                 
                 result = await session.execute(
                     text(stats_sql),
-                    {"country": country_iso, "year": str(year), "min_frp": min_frp}
+                    {"country": country_iso, "year_start": f"{year}-01-01", "year_end": f"{int(year) + 1}-01-01", "min_frp": min_frp}
                 )
                 stats = result.fetchone()
                 
@@ -1093,14 +1096,15 @@ class LLMOrchestrator:
                         AVG(brightness) as avg_brightness
                     FROM fire_detections
                     WHERE country = :country
-                    AND strftime('%Y', acq_date) = :year
+                    AND acq_date >= :year_start
+                    AND acq_date < :year_end
                     GROUP BY strftime('%m', acq_date)
                     ORDER BY strftime('%m', acq_date)
                 """
                 
                 result = await session.execute(
                     text(query_sql),
-                    {"country": country_iso, "year": str(year)}
+                    {"country": country_iso, "year_start": f"{year}-01-01", "year_end": f"{int(year) + 1}-01-01"}
                 )
                 fire_data = result.fetchall()
                 await session.commit()
@@ -1526,9 +1530,10 @@ class LLMOrchestrator:
                         SELECT latitude, longitude, frp, brightness, confidence, acq_date
                         FROM fire_detections
                         WHERE country = :country
-                        AND strftime('%Y', acq_date) = :year
+                        AND acq_date >= :year_start
+                        AND acq_date < :year_end
                     """),
-                    {"country": country_iso, "year": str(year)}
+                    {"country": country_iso, "year_start": f"{year}-01-01", "year_end": f"{int(year) + 1}-01-01"}
                 )
                 fires_raw = result.fetchall()
                 await session.commit()
@@ -1567,31 +1572,25 @@ class LLMOrchestrator:
             if strategic_regions:
                 logger.info(f"Using {len(strategic_regions)} strategic forest regions")
                 
-                for idx, region_bbox in enumerate(strategic_regions, 1):
-                    regions_queried += 1
-                    
-                    try:
-                        forest_mask, forest_coords = mpc_service.get_forest_pixels_in_bbox(
-                            region_bbox,
-                            year,
-                            max_pixels=5000
-                        )
+                region_results = await mpc_service.aget_forest_pixels_multi(
+                    strategic_regions,
+                    year,
+                    max_pixels=5000
+                )
+                regions_queried = len(strategic_regions)
+                
+                for forest_count, forest_coords in region_results:
+                    if len(forest_coords) > 0:
+                        regions_with_data += 1
+                        total_forest_pixels += len(forest_coords)
                         
-                        if len(forest_coords) > 0:
-                            regions_with_data += 1
-                            total_forest_pixels += len(forest_coords)
+                        for lat, lon in forest_coords.tolist():
+                            h3_idx = spatial_ops.lat_lon_to_h3(lat, lon, resolution=7)
                             
-                            for lat, lon in forest_coords:
-                                h3_idx = spatial_ops.lat_lon_to_h3(lat, lon, resolution=7)
-                                
-                                if h3_idx not in forest_hexagons:
-                                    forest_hexagons[h3_idx] = 0
-                                
-                                forest_hexagons[h3_idx] += 0.00001
-                    
-                    except Exception as e:
-                        logger.warning(f"Region {idx} failed: {e}")
-                        continue
+                            if h3_idx not in forest_hexagons:
+                                forest_hexagons[h3_idx] = 0
+                            
+                            forest_hexagons[h3_idx] += 0.00001
             
             # Fallback to GFW if no MPC data
             data_source = "Unknown"
@@ -1939,7 +1938,7 @@ class LLMOrchestrator:
         if not relevant_docs:
             return "I don't have enough context to answer this question."
         
-        context = "\n\n".join([doc["document"] for doc in relevant_docs])
+        context = "\n\n".join(doc["document"] for doc in relevant_docs)
         
         from app.llm.prompts.system_prompts import RAG_CONTEXT_PROMPT
         from groq import AsyncGroq
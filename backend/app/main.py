@@ -61,6 +61,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     try:
         await close_db()
         logger.info("✅ Database closed")
+        
+        from app.services.boundary_service import boundary_service
+        await boundary_service.aclose()
     except Exception as e:
         logger.error(f"❌ Shutdown error: {e}")
 
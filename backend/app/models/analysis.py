@@ -20,13 +20,27 @@ ARCHITECTURE:
 from sqlalchemy import Column, Integer, Float, String, DateTime, Index, Text, Boolean
 from sqlalchemy.sql import func
 from datetime import datetime
+from functools import lru_cache
+import hashlib
 import uuid
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 from app.database import Base
 
 
+@lru_cache(maxsize=4096)
+def _hash_cache_key(analysis_type: str,
+                    region_identifier: str,
+                    datasets: Tuple[str, ...],
+                    start_day: int,
+                    end_day: int,
+                    h3_resolution: int) -> str:
+    """BLAKE2b digest of normalized analysis parameters (memoized)."""
+    key = f"{analysis_type}|{region_identifier}|{','.join(datasets)}|{start_day}|{end_day}|{h3_resolution}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
 class AnalysisResult(Base):
     """
     Cached spatial correlation analysis results.
@@ -159,6 +173,10 @@ class AnalysisResult(Base):
         
         # Find recent analyses
         Index('idx_analysis_created', 'created_at'),
+        
+        # Cache lookup (find_cached_analysis): one index seek on all filter columns
+        Index('idx_analysis_cache_lookup', 'analysis_type', 'region_identifier',
+              'start_date', 'end_date', 'h3_resolution'),
     )
     
     def __repr__(self):
@@ -312,12 +330,40 @@ class AnalysisResult(Base):
             h3_resolution: H3 resolution
         
         Returns:
-            Unique cache key string
+            Unique cache key string (32 hex characters)
+        """
+        # Hashable, day-granular inputs so repeated keys hit the memo
+        return _hash_cache_key(
+            analysis_type,
+            region_identifier,
+            tuple(sorted(datasets)),
+            start_date.toordinal(),
+            end_date.toordinal(),
+            h3_resolution
+        )
+    
+    @classmethod
+    def cache_lookup_query(cls,
+                           analysis_type: str,
+                           region_identifier: str,
+                           start_date: datetime,
+                           end_date: datetime,
+                           h3_resolution: int):
         """
-        datasets_str = "_".join(sorted(datasets))
-        date_str = f"{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
+        Query used by find_cached_analysis.
         
-        return f"{analysis_type}_{region_identifier}_{datasets_str}_{date_str}_h3{h3_resolution}"
+        Works with both sync and async sessions.
+        """
+        from sqlalchemy import select, lambda_stmt
+        
+        # lambda_stmt: compiled once, arguments are bound as parameters
+        return lambda_stmt(lambda: select(AnalysisResult).filter(
+            AnalysisResult.analysis_type == analysis_type,
+            AnalysisResult.region_identifier == region_identifier,
+            AnalysisResult.start_date == start_date,
+            AnalysisResult.end_date == end_date,
+            AnalysisResult.h3_resolution == h3_resolution
+        ))
     
     @classmethod
     async def find_cached_analysis(cls,
@@ -341,14 +387,12 @@ class AnalysisResult(Base):
         Returns:
             AnalysisResult if found, None otherwise
         """
-        from sqlalchemy import select
-        
-        stmt = select(cls).filter(
-            cls.analysis_type == analysis_type,
-            cls.region_identifier == region_identifier,
-            cls.start_date == start_date,
-            cls.end_date == end_date,
-            cls.h3_resolution == h3_resolution
+        stmt = cls.cache_lookup_query(
+            analysis_type,
+            region_identifier,
+            start_date,
+            end_date,
+            h3_resolution
         )
         
         result = await session.execute(stmt)
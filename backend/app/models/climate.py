@@ -25,8 +25,9 @@ ENHANCEMENTS:
 """
 
 import requests
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Dict, Optional, List, Tuple
 import logging
 
@@ -252,20 +253,17 @@ class ClimateMonitor:
         aggregated = {"time": time_series}
         
         # For each variable, average across all sample points
-        variables = [v for v in base_data.keys() if v != "time"]
-        
-        for var in variables:
-            values = []
-            for data in data_list:
-                if var in data["daily"]:
-                    values.append(data["daily"][var])
+        for var in (v for v in base_data if v != "time"):
+            values = [data["daily"][var] for data in data_list if var in data["daily"]]
             
-            # Average across sample points
+            # Average across sample points (one pass per day over the points)
             if values:
                 aggregated[var] = [
-                    sum(v[i] for v in values if v[i] is not None) / len([v for v in values if v[i] is not None])
-                    if any(v[i] is not None for v in values) else None
-                    for i in range(len(time_series))
+                    sum(present) / len(present) if present else None
+                    for present in (
+                        [v[i] for v in values if v[i] is not None]
+                        for i in range(len(time_series))
+                    )
                 ]
         
         return aggregated
@@ -289,10 +287,11 @@ class ClimateMonitor:
             if var_name == "time":
                 continue
             
-            # Filter out None values
-            valid_values = [v for v in values if v is not None]
+            # None (missing days) becomes NaN so reductions run in numpy
+            arr = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            count = int(np.count_nonzero(~np.isnan(arr)))
             
-            if not valid_values:
+            if not count:
                 stats[var_name] = {
                     "count": 0,
                     "mean": None,
@@ -303,11 +302,11 @@ class ClimateMonitor:
                 continue
             
             stats[var_name] = {
-                "count": len(valid_values),
-                "mean": round(sum(valid_values) / len(valid_values), 2),
-                "min": round(min(valid_values), 2),
-                "max": round(max(valid_values), 2),
-                "total": round(sum(valid_values), 2) if "precipitation" in var_name else None
+                "count": count,
+                "mean": round(float(np.nanmean(arr)), 2),
+                "min": round(float(np.nanmin(arr)), 2),
+                "max": round(float(np.nanmax(arr)), 2),
+                "total": round(float(np.nansum(arr)), 2) if "precipitation" in var_name else None
             }
         
         return stats
@@ -388,14 +387,14 @@ class ClimateMonitor:
         Returns:
             Dict with recent climate data
         """
-        end_date = datetime.now()
+        end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
         return self.get_historical_data(
             latitude,
             longitude,
-            start_date.strftime("%Y-%m-%d"),
-            end_date.strftime("%Y-%m-%d")
+            start_date.isoformat(),
+            end_date.isoformat()
         )
     
     def health_check(self) -> Dict:
@@ -407,14 +406,14 @@ class ClimateMonitor:
         """
         try:
             # Test with a simple query (Islamabad, Pakistan, last 7 days)
-            end_date = datetime.now()
+            end_date = date.today()
             start_date = end_date - timedelta(days=7)
             
             params = {
                 "latitude": 30.3753,
                 "longitude": 69.3451,
-                "start_date": start_date.strftime("%Y-%m-%d"),
-                "end_date": end_date.strftime("%Y-%m-%d"),
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
                 "daily": "temperature_2m_max"
             }
             
@@ -1,12 +1,16 @@
 """NASA FIRMS Fire Data Model - SQLite Compatible"""
 
 from sqlalchemy import Column, Integer, Float, String, DateTime, Index, Text
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 import h3
 from app.database import Base
 import uuid
 from datetime import datetime
 
+# h3 v4 renamed geo_to_h3 -> latlng_to_cell; resolve once at import
+_latlng_to_cell = h3.latlng_to_cell if hasattr(h3, 'latlng_to_cell') else h3.geo_to_h3
+
 
 class FireDetection(Base):
     """NASA FIRMS fire detection record with multi-resolution H3 indexing."""
@@ -45,6 +49,7 @@ class FireDetection(Base):
     
     # Temporal information
     acq_date = Column(DateTime, nullable=False, index=True)
+    year = Column(Integer, comment="Acquisition year, denormalized from acq_date")
     acq_time = Column(String(4))
     daynight = Column(String(1))
     
@@ -61,6 +66,7 @@ class FireDetection(Base):
         Index('idx_fires_frp_date', 'frp', 'acq_date'),
         Index('idx_fires_location', 'latitude', 'longitude'),
         Index('idx_fires_country_year', 'country', 'acq_date'),  # NEW - for historical queries
+        Index('idx_fires_country_acq_year', 'country', 'year'),
     )
 
     def __init__(self, latitude: float, longitude: float, **kwargs):
@@ -71,16 +77,10 @@ class FireDetection(Base):
         self.longitude = longitude
         
         # Generate H3 indexes
-        if hasattr(h3, 'latlng_to_cell'):
-            self.h3_index_12 = h3.latlng_to_cell(latitude, longitude, 12)
-            self.h3_index_9 = h3.latlng_to_cell(latitude, longitude, 9)
-            self.h3_index_6 = h3.latlng_to_cell(latitude, longitude, 6)
-            self.h3_index_5 = h3.latlng_to_cell(latitude, longitude, 5)
-        else:
-            self.h3_index_12 = h3.geo_to_h3(latitude, longitude, 12)
-            self.h3_index_9 = h3.geo_to_h3(latitude, longitude, 9)
-            self.h3_index_6 = h3.geo_to_h3(latitude, longitude, 6)
-            self.h3_index_5 = h3.geo_to_h3(latitude, longitude, 5)
+        self.h3_index_12 = _latlng_to_cell(latitude, longitude, 12)
+        self.h3_index_9 = _latlng_to_cell(latitude, longitude, 9)
+        self.h3_index_6 = _latlng_to_cell(latitude, longitude, 6)
+        self.h3_index_5 = _latlng_to_cell(latitude, longitude, 5)
         
         # Field mapping for NASA CSV compatibility
         field_mapping = {
@@ -102,11 +102,19 @@ class FireDetection(Base):
             
             if hasattr(self, model_field):
                 setattr(self, model_field, value)
-
-    @property
-    def year(self) -> int:
-        """Extract year from acquisition date."""
-        return self.acq_date.year if self.acq_date else None
+    
+    @validates('acq_date')
+    def _sync_year(self, key, value):
+        """Keep the denormalized year column in step with acq_date."""
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                pass
+        
+        if isinstance(value, datetime):
+            self.year = value.year
+        return value
 
     def __repr__(self):
         return f"<FireDetection(id={self.id}, country={self.country}, lat={self.latitude}, lon={self.longitude}, date={self.acq_date})>"
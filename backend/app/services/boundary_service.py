@@ -6,18 +6,128 @@ Works worldwide using Nominatim + bbox expansion
 import httpx
 from typing import Optional, Dict, Any, List
 import asyncio
+import json
 import math
+import time
+from functools import lru_cache
+import numpy as np
 from app.utils.logger import get_logger
+from app.utils.geokernels import bbox_area
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# httpx only speaks HTTP/2 when the h2 package is installed
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 logger = get_logger(__name__)
 
 
+# Type-based expansion radius (km)
+_TYPE_RADIUS = {
+    "city": 15,
+    "town": 8,
+    "village": 3,
+    "suburb": 5,
+    "municipality": 12,
+    "administrative": 20,
+    "state": 50,
+    "country": 100,
+}
+
+# Hardcoded boundaries for major cities (last resort)
+_HARDCODED_BOUNDARIES = {
+    # Pakistan
+    "lahore": {
+        "lons": np.array([74.1847, 74.4462, 74.5051, 74.4380, 74.2431,
+                          74.0847, 73.9993, 74.0993, 74.1847]),
+        "lats": np.array([31.6340, 31.6217, 31.4732, 31.3204, 31.2641,
+                          31.3455, 31.4903, 31.5903, 31.6340]),
+        "bbox": np.array([73.9993, 31.2641, 74.5051, 31.6340]),
+        "area": 1772.0
+    },
+    # Add more major cities as needed
+}
+
+# ~111 km per degree: km² per square degree, and degrees per km
+_DEG2KM_SQ = 111.0 * 111.0
+_KM2DEG = 1.0 / 111.0
+
+
+def _loads(content: bytes) -> Any:
+    """Parse a JSON response body (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
 class BoundaryService:
     """Global boundary service with multiple fallback strategies"""
     
+    _HEADERS = {"User-Agent": "GeoWise-AI/1.0"}
+    
     def __init__(self):
         self.nominatim_url = "https://nominatim.openstreetmap.org"
         self.timeout = 30.0
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Nominatim usage policy: max 1 request/second, shared by all strategies
+        self._nominatim_sem: Optional[asyncio.Semaphore] = None
+        self._min_interval = 1.0
+        self._last_call = 0.0
+        
+        # Client and semaphore bind to the loop that first uses them; this
+        # singleton is also driven from run_until_complete / repeated
+        # asyncio.run calls, so both are recreated when the loop changes
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _bind_loop(self):
+        """Recreate loop-bound state if called from a different event loop"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # The old client's connections belong to the old loop; drop it
+            # rather than awaiting aclose() on a loop that may be gone
+            self._client = None
+            self._nominatim_sem = asyncio.Semaphore(1)
+            self._loop = loop
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client (created lazily, per running loop)"""
+        self._bind_loop()
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers=self._HEADERS,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared HTTP client (if it belongs to the running loop)"""
+        if (self._client is not None and not self._client.is_closed
+                and self._loop is asyncio.get_running_loop()):
+            await self._client.aclose()
+        self._client = None
+    
+    async def _nominatim_get(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        """GET from Nominatim: one request in flight, at most one per second"""
+        self._bind_loop()
+        async with self._nominatim_sem:
+            wait = self._min_interval - (time.monotonic() - self._last_call)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await self._get_client().get(f"{self.nominatim_url}{path}", params=params)
+            finally:
+                self._last_call = time.monotonic()
     
     async def get_city_boundary(
         self,
@@ -76,24 +186,42 @@ class BoundaryService:
         try:
             search_query = f"{city_name}, {country}" if country else city_name
             
+            # Cheap search first (no polygons), then fetch the polygon of the
+            # single best area candidate via /lookup
             params = {
                 "q": search_query,
                 "format": "json",
-                "polygon_geojson": 1,
-                "limit": 10
+                "limit": 5
             }
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.nominatim_url}/search",
-                    params=params,
-                    headers={"User-Agent": "GeoWise-AI/1.0"}
-                )
+            response = await self._nominatim_get("/search", params)
             
             if response.status_code != 200:
                 return None
             
-            results = response.json()
+            candidates = [
+                r for r in _loads(response.content)
+                if r.get("osm_type") in ("relation", "way")
+            ]
+            
+            if not candidates:
+                return None
+            
+            best = max(candidates, key=lambda r: r.get("importance", 0))
+            
+            response = await self._nominatim_get(
+                "/lookup",
+                {
+                    "osm_ids": f"{best['osm_type'][0].upper()}{best['osm_id']}",
+                    "format": "json",
+                    "polygon_geojson": 1
+                }
+            )
+            
+            if response.status_code != 200:
+                return None
+            
+            results = _loads(response.content)
             
             if not results:
                 return None
@@ -113,13 +241,12 @@ class BoundaryService:
                         coords = geojson["coordinates"][0]
                     else:
                         # Take largest polygon from MultiPolygon
-                        coords = max(geojson["coordinates"], key=lambda p: len(p[0]))[0]
+                        ring_lens = [len(p[0]) for p in geojson["coordinates"]]
+                        coords = geojson["coordinates"][ring_lens.index(max(ring_lens))][0]
                     
-                    # Calculate bbox and area
-                    lons = [c[0] for c in coords]
-                    lats = [c[1] for c in coords]
-                    bbox = [min(lons), min(lats), max(lons), max(lats)]
-                    area_km2 = (max(lons) - min(lons)) * (max(lats) - min(lats)) * 111 * 111
+                    # Calculate bbox and area (one pass over the ring)
+                    min_lon, min_lat, max_lon, max_lat, area_km2 = bbox_area(coords)
+                    bbox = [min_lon, min_lat, max_lon, max_lat]
                     
                     return {
                         "name": city_name,
@@ -158,17 +285,12 @@ class BoundaryService:
                 "limit": 1
             }
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.nominatim_url}/search",
-                    params=params,
-                    headers={"User-Agent": "GeoWise-AI/1.0"}
-                )
+            response = await self._nominatim_get("/search", params)
             
             if response.status_code != 200:
                 return None
             
-            results = response.json()
+            results = _loads(response.content)
             
             if not results:
                 return None
@@ -198,7 +320,7 @@ class BoundaryService:
                 [bbox[0], bbox[1]],  # Close
             ]
             
-            area_km2 = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]) * 111 * 111
+            area_km2 = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]) * _DEG2KM_SQ
             
             logger.info(f"Expanded {city_name} point to {radius_km}km radius boundary")
             
@@ -217,26 +339,16 @@ class BoundaryService:
             logger.error(f"Nominatim point expansion failed: {e}")
             return None
     
-    def _calculate_expansion_radius(self, city_type: str, place_rank: int) -> float:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _calculate_expansion_radius(city_type: str, place_rank: int) -> float:
         """
         Calculate intelligent expansion radius based on city type
         
         OSM place_rank: 1-30 (lower = more important)
         """
         
-        # Type-based radius (km)
-        type_radius = {
-            "city": 15,
-            "town": 8,
-            "village": 3,
-            "suburb": 5,
-            "municipality": 12,
-            "administrative": 20,
-            "state": 50,
-            "country": 100,
-        }
-        
-        base_radius = type_radius.get(city_type, 10)
+        base_radius = _TYPE_RADIUS.get(city_type, 10)
         
         # Adjust by place rank (major cities have lower rank)
         if place_rank <= 8:  # Major city
@@ -267,8 +379,8 @@ class BoundaryService:
         """
         
         # Convert km to degrees (rough approximation)
-        lat_offset = radius_km / 111.0
-        lon_offset = radius_km / (111.0 * math.cos(math.radians(lat)))
+        lat_offset = radius_km * _KM2DEG
+        lon_offset = radius_km * _KM2DEG / math.cos(math.radians(lat))
         
         return [
             lon - lon_offset,  # min_lon
@@ -277,36 +389,30 @@ class BoundaryService:
             lat + lat_offset,  # max_lat
         ]
     
-    def _get_hardcoded_boundary(self, city_name: str) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _get_hardcoded_boundary(city_name: str) -> Optional[Dict[str, Any]]:
         """
         Strategy 3: Hardcoded boundaries for major cities (last resort)
         """
         
-        HARDCODED = {
-            # Pakistan
-            "lahore": {
-                "coords": [[74.1847, 31.6340], [74.4462, 31.6217], [74.5051, 31.4732],
-                          [74.4380, 31.3204], [74.2431, 31.2641], [74.0847, 31.3455],
-                          [73.9993, 31.4903], [74.0993, 31.5903], [74.1847, 31.6340]],
-                "bbox": [73.9993, 31.2641, 74.5051, 31.6340],
-                "area": 1772.0
-            },
-            # Add more major cities as needed
-        }
-        
         key = city_name.lower().strip()
-        data = HARDCODED.get(key)
+        data = _HARDCODED_BOUNDARIES.get(key)
         
         if not data:
             return None
         
+        # Polygons are kept as lon/lat columns; GeoJSON lists are only
+        # built here, once per city (lru_cache)
+        coords = np.column_stack([data["lons"], data["lats"]]).tolist()
+        
         return {
             "name": city_name,
             "boundary": {
                 "type": "Polygon",
-                "coordinates": [data["coords"]]
+                "coordinates": [coords]
             },
-            "bbox": data["bbox"],
+            "bbox": data["bbox"].tolist(),
             "area_km2": data["area"],
             "source": "Hardcoded"
         }
@@ -260,7 +260,7 @@ class GFWService(BaseService):
         if layers is None:
             layers = list(self.TILE_LAYERS.keys())
 
-        invalid_layers = set(layers) - set(self.TILE_LAYERS.keys())
+        invalid_layers = set(layers) - self.TILE_LAYERS.keys()
         if invalid_layers:
             raise DataValidationError(
                 f"Invalid layers: {invalid_layers}. Valid: {list(self.TILE_LAYERS.keys())}",
@@ -1,24 +1,400 @@
 """Microsoft Planetary Computer Service - Smart Sampling"""
 
+import asyncio
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import rasterio
-from rasterio.windows import from_bounds
+from rasterio.windows import Window, from_bounds
+from rasterio.enums import Resampling
 from rasterio.warp import transform_bounds
+from pyproj import Transformer
+from pystac_client import Client
+from pystac_client.stac_api_io import StacApiIO
 import planetary_computer as pc
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from app.config import settings
 from app.utils.logger import get_logger
 
+try:
+    from numba import get_num_threads, njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = get_logger(__name__)
 
 
+# GDAL settings for reading remote Cloud-Optimized GeoTIFFs over HTTP.
+# - GDAL_DISABLE_READDIR_ON_OPEN: skip listing the "directory" of the signed URL
+# - CPL_VSIL_CURL_ALLOWED_EXTENSIONS: only probe files that look like rasters
+# - GDAL_HTTP_MULTIPLEX / GDAL_HTTP_VERSION: multiplex range requests over HTTP/2
+# - VSI_CACHE / VSI_CACHE_SIZE: keep fetched byte ranges in memory (64 MB)
+# - CPL_VSIL_CURL_USE_HEAD: skip the HEAD request before the first GET
+# - GDAL_INGESTED_BYTES_AT_OPEN: fetch the COG header in one 32 KB request
+COG_ENV_OPTIONS = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "CPL_VSIL_CURL_ALLOWED_EXTENSIONS": ".tif,.tiff",
+    "GDAL_HTTP_MULTIPLEX": "YES",
+    "GDAL_HTTP_VERSION": "2",
+    "VSI_CACHE": "TRUE",
+    "VSI_CACHE_SIZE": str(64 << 20),
+    "CPL_VSIL_CURL_USE_HEAD": "NO",
+    "GDAL_INGESTED_BYTES_AT_OPEN": str(32768),
+}
+
+# Shared HTTP session for the STAC client: keeps TLS connections alive across
+# searches and retries transient failures (STAC search POSTs are idempotent)
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"GET", "POST"})
+        )
+    )
+)
+
+# Search results carry signed hrefs, so they are cached in 5-minute buckets,
+# well inside the lifetime of MPC SAS tokens
+SIGN_CACHE_SECONDS = 300
+
+# Per-request timeout for STAC API calls, in seconds
+STAC_TIMEOUT_SECONDS = 60
+
+
+@lru_cache(maxsize=4)
+def _get_catalog(stac_url: str) -> Client:
+    """Open the STAC catalog once; items are signed as they are iterated"""
+    
+    # Same 60 s budget the search POST always had; without it a stalled
+    # search would hold its worker thread indefinitely
+    stac_io = StacApiIO(timeout=STAC_TIMEOUT_SECONDS)
+    stac_io.session = _session
+    
+    return Client.open(stac_url, modifier=pc.sign_inplace, stac_io=stac_io)
+
+
+@lru_cache(maxsize=256)
+def _search_features(
+    stac_url: str,
+    collection_id: str,
+    bbox: Tuple[float, ...],
+    year: int,
+    limit: int,
+    expires_epoch: int
+) -> Tuple[Dict, ...]:
+    """Run a STAC search (memoized; failures raise and are not cached)"""
+    
+    search = _get_catalog(stac_url).search(
+        collections=[collection_id],
+        bbox=list(bbox),
+        datetime=str(year),
+        limit=limit,
+        max_items=limit
+    )
+    
+    return tuple(search.items_as_dicts())
+
+
+class _CachedDataset:
+    """Open handle plus its lock and pin count (guarded by _DatasetCache._lock)"""
+    
+    __slots__ = ("dataset", "lock", "refs", "evicted")
+    
+    def __init__(self, dataset: rasterio.DatasetReader):
+        self.dataset = dataset
+        self.lock = threading.Lock()
+        self.refs = 0
+        self.evicted = False
+
+
+class _DatasetCache:
+    """
+    Small LRU of open remote raster handles
+    
+    Re-opening a COG costs a header fetch over HTTP, so handles are kept
+    open between calls. Keys are signed URLs, which embed the SAS expiry,
+    so expired handles are never reused. DatasetReader is not thread-safe:
+    each handle has its own lock. Handles are pinned while in use, and an
+    evicted handle is closed only once its last user releases it.
+    """
+    
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, _CachedDataset]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def open(self, url: str) -> Iterator[rasterio.DatasetReader]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                entry.refs += 1
+        
+        if entry is None:
+            opened = _CachedDataset(rasterio.open(url))
+            to_close = []
+            
+            with self._lock:
+                entry = self._entries.get(url)
+                if entry is None:
+                    entry = opened
+                    self._entries[url] = entry
+                else:
+                    # Another thread opened it first; ours was never shared
+                    to_close.append(opened)
+                entry.refs += 1
+                
+                while len(self._entries) > self.maxsize:
+                    old = self._entries.popitem(last=False)[1]
+                    old.evicted = True
+                    if old.refs == 0:
+                        to_close.append(old)
+            
+            for stale in to_close:
+                stale.dataset.close()
+        
+        try:
+            with entry.lock:
+                yield entry.dataset
+        finally:
+            with self._lock:
+                entry.refs -= 1
+                release = entry.evicted and entry.refs == 0
+            if release:
+                entry.dataset.close()
+
+
+_dataset_cache = _DatasetCache(maxsize=16)
+
+
+# io-lulc-annual-v02 classes counted as forest (2 = Trees), as a 256-entry
+# lookup table so one gather maps every class value to forest/non-forest
+FOREST_CLASSES = (2,)
+FOREST_CLASS_LUT = np.zeros(256, dtype=np.uint8)
+FOREST_CLASS_LUT[list(FOREST_CLASSES)] = 1
+FOREST_CLASS_LUT.flags.writeable = False
+
+# Per-thread scratch buffer for raster reads, reused across calls so repeated
+# region reads don't allocate a fresh multi-MB array each time
+_read_buffers = threading.local()
+
+
+def _read_buffer(shape: Tuple[int, int], dtype) -> np.ndarray:
+    """
+    Thread-local reusable buffer viewed as `shape`
+    
+    The returned array is overwritten by the next read on the same thread.
+    """
+    size = shape[0] * shape[1]
+    dtype = np.dtype(dtype)
+    buf = getattr(_read_buffers, "buf", None)
+    
+    if buf is None or buf.size < size or buf.dtype != dtype:
+        buf = np.empty(size, dtype=dtype)
+        _read_buffers.buf = buf
+    
+    return buf[:size].reshape(shape)
+
+
+def _no_coords() -> np.ndarray:
+    """Empty (0, 2) float32 coordinate array"""
+    return np.empty((0, 2), dtype=np.float32)
+
+
+def _frozen_regions(bboxes: List[List[float]]) -> np.ndarray:
+    regions = np.array(bboxes, dtype=np.float32).reshape(-1, 4)
+    regions.flags.writeable = False
+    return regions
+
+
+# Known forested areas per country, [west, south, east, north] in WGS84
+STRATEGIC_REGIONS: Dict[str, np.ndarray] = {
+    "BRA": _frozen_regions([
+        # Amazon regions (known forest areas)
+        [-62.0, -3.0, -61.0, -2.0],    # Manaus region
+        [-60.0, -3.0, -59.0, -2.0],    # Central Amazon
+        [-55.0, -3.5, -54.0, -2.5],    # Eastern Amazon
+        [-58.0, -1.0, -57.0, 0.0],     # Northern Amazon
+        [-63.0, -5.0, -62.0, -4.0],    # Western Amazon
+        # Cerrado/Forest transition
+        [-48.0, -15.0, -47.0, -14.0],  # Central Brazil
+        # Atlantic Forest
+        [-44.0, -23.0, -43.0, -22.0],  # Rio region
+    ]),
+    "IDN": _frozen_regions([
+        # Sumatra
+        [100.0, -2.0, 101.0, -1.0],
+        [101.0, 0.0, 102.0, 1.0],
+        # Kalimantan (Borneo)
+        [110.0, -1.0, 111.0, 0.0],
+        [112.0, 0.5, 113.0, 1.5],
+        # Papua
+        [138.0, -3.0, 139.0, -2.0],
+    ]),
+    "PAK": _frozen_regions([
+        # Northern forests
+        [73.0, 35.0, 74.0, 36.0],
+        [74.5, 34.5, 75.5, 35.5],
+    ]),
+}
+
+_NO_REGIONS = _frozen_regions([])
+
+
+COUNTRY_BBOXES: Dict[str, Tuple[float, float, float, float]] = {
+    "BRA": (-73.9872, -33.7683, -34.7299, 5.2842),
+    "IDN": (95.0, -11.0, 141.0, 6.0),
+    "PAK": (60.87, 23.63, 77.84, 37.08),
+}
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _class_histogram_kernel(data, n_chunks):
+        # One partial histogram per row chunk (one chunk per thread) keeps
+        # the parallel loop race-free at n_chunks x 2 KiB of scratch
+        rows, cols = data.shape
+        step = (rows + n_chunks - 1) // n_chunks
+        partial = np.zeros((n_chunks, 256), np.int64)
+        for c in prange(n_chunks):
+            for i in range(c * step, min(rows, (c + 1) * step)):
+                for j in range(cols):
+                    partial[c, data[i, j]] += 1
+        return partial.sum(axis=0)
+
+
+def partial_sample(n: int, k: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    k distinct indices from range(n) via a partial Fisher-Yates shuffle
+    
+    Only the swapped slots are tracked, so memory and time are O(k)
+    rather than the O(n) permutation behind choice(replace=False).
+    """
+    picks = rng.integers(np.arange(k), n)
+    swapped: Dict[int, int] = {}
+    out = np.empty(k, dtype=np.int64)
+    
+    for i, j in enumerate(picks.tolist()):
+        out[i] = swapped.get(j, j)
+        swapped[j] = swapped.get(i, i)
+    
+    return out
+
+
+def class_histogram(data: np.ndarray) -> np.ndarray:
+    """Pixel count per class value (0-255) of a classification raster"""
+    
+    if NUMBA_AVAILABLE and data.dtype == np.uint8 and data.ndim == 2:
+        return _class_histogram_kernel(data, max(1, min(get_num_threads(), data.shape[0])))
+    
+    return np.bincount(data.ravel(), minlength=256)
+
+
 class MPCService:
     """Microsoft Planetary Computer STAC API client"""
     
     def __init__(self):
         self.stac_url = "https://planetarycomputer.microsoft.com/api/stac/v1"
         self.collection_id = "io-lulc-annual-v02"
+        
+        # Reprojection to WGS84, one Transformer per source CRS
+        self._to_wgs84: Dict[str, Transformer] = {}
+    
+    def _get_wgs84_transformer(self, crs) -> Transformer:
+        """Get (cached) transformer from a raster CRS to EPSG:4326"""
+        
+        key = crs.to_string()
+        transformer = self._to_wgs84.get(key)
+        
+        if transformer is None:
+            transformer = Transformer.from_crs(crs, 'EPSG:4326', always_xy=True)
+            self._to_wgs84[key] = transformer
+        
+        return transformer
+    
+    @staticmethod
+    def _snap_to_blocks(window: Window, src) -> Window:
+        """
+        Expand an integer window to the raster's internal block grid
+        
+        Reading whole COG blocks avoids GDAL decoding partial tiles
+        that are then thrown away.
+        """
+        bh, bw = src.block_shapes[0]
+        
+        col_off = (window.col_off // bw) * bw
+        row_off = (window.row_off // bh) * bh
+        
+        col_end = -(-(window.col_off + window.width) // bw) * bw
+        row_end = -(-(window.row_off + window.height) // bh) * bh
+        
+        return Window(
+            col_off,
+            row_off,
+            min(col_end, src.width) - col_off,
+            min(row_end, src.height) - row_off
+        )
+    
+    @staticmethod
+    def _read_blocks_parallel(data_url: str, window: Window, src) -> np.ndarray:
+        """
+        Read a block-aligned window with one task per internal block
+        
+        DatasetReader is not thread-safe, so every worker thread opens its
+        own handle on the (already signed) asset URL once and reuses it for
+        all of its blocks; handles are closed when the read completes.
+        """
+        bh, bw = src.block_shapes[0]
+        col_end = window.col_off + window.width
+        row_end = window.row_off + window.height
+        
+        sub_windows = [
+            Window(col, row, min(bw, col_end - col), min(bh, row_end - row))
+            for row in range(window.row_off, row_end, bh)
+            for col in range(window.col_off, col_end, bw)
+        ]
+        
+        worker_handles = threading.local()
+        opened: List[rasterio.DatasetReader] = []
+        
+        def read_block(sub: Window) -> Tuple[Window, np.ndarray]:
+            with rasterio.Env(**COG_ENV_OPTIONS):
+                ds = getattr(worker_handles, "ds", None)
+                if ds is None:
+                    ds = worker_handles.ds = rasterio.open(data_url)
+                    opened.append(ds)
+                return sub, ds.read(1, window=sub)
+        
+        data = _read_buffer((window.height, window.width), src.dtypes[0])
+        workers = min(settings.MPC_READ_WORKERS, len(sub_windows))
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for sub, block in executor.map(read_block, sub_windows):
+                    row = sub.row_off - window.row_off
+                    col = sub.col_off - window.col_off
+                    data[row:row + block.shape[0], col:col + block.shape[1]] = block
+        finally:
+            for ds in opened:
+                ds.close()
+        
+        return data
     
     def get_strategic_regions(self, country_iso: str) -> List[List[float]]:
         """
@@ -26,72 +402,45 @@ class MPCService:
         
         Uses known forested areas instead of uniform grid
         """
-        
-        regions = {
-            "BRA": [
-                # Amazon regions (known forest areas)
-                [-62.0, -3.0, -61.0, -2.0],    # Manaus region
-                [-60.0, -3.0, -59.0, -2.0],    # Central Amazon
-                [-55.0, -3.5, -54.0, -2.5],    # Eastern Amazon
-                [-58.0, -1.0, -57.0, 0.0],     # Northern Amazon
-                [-63.0, -5.0, -62.0, -4.0],    # Western Amazon
-                # Cerrado/Forest transition
-                [-48.0, -15.0, -47.0, -14.0],  # Central Brazil
-                # Atlantic Forest
-                [-44.0, -23.0, -43.0, -22.0],  # Rio region
-            ],
-            "IDN": [
-                # Sumatra
-                [100.0, -2.0, 101.0, -1.0],
-                [101.0, 0.0, 102.0, 1.0],
-                # Kalimantan (Borneo)
-                [110.0, -1.0, 111.0, 0.0],
-                [112.0, 0.5, 113.0, 1.5],
-                # Papua
-                [138.0, -3.0, 139.0, -2.0],
-            ],
-            "PAK": [
-                # Northern forests
-                [73.0, 35.0, 74.0, 36.0],
-                [74.5, 34.5, 75.5, 35.5],
-            ]
-        }
-        
-        return regions.get(country_iso, [])
+        return self.get_strategic_region_array(country_iso).tolist()
+    
+    @staticmethod
+    def get_strategic_region_array(country_iso: str) -> np.ndarray:
+        """Strategic regions as a read-only (N, 4) float32 array of bboxes"""
+        return STRATEGIC_REGIONS.get(country_iso, _NO_REGIONS)
     
     def search_items(self, bbox: List[float], year: int, limit: int = 10) -> List[Dict]:
-        """Search for land cover items"""
-        
-        search_url = f"{self.stac_url}/search"
-        
-        search_params = {
-            "collections": [self.collection_id],
-            "bbox": bbox,
-            "datetime": f"{year}-01-01/{year}-12-31",
-            "limit": limit
-        }
+        """Search for land cover items (cached per bbox/year/limit)"""
         
         try:
-            response = requests.post(search_url, json=search_params, timeout=60)
-            
-            if response.status_code == 200:
-                results = response.json()
-                features = results.get('features', [])
-                return features
-            else:
-                logger.error(f"Search failed: {response.status_code}")
-                return []
-                
+            return list(_search_features(
+                self.stac_url,
+                self.collection_id,
+                tuple(bbox),
+                year,
+                limit,
+                int(time.time() // SIGN_CACHE_SECONDS)
+            ))
+        
         except Exception as e:
             logger.error(f"Search error: {str(e)}")
             return []
     
+    async def asearch_items(self, bbox: List[float], year: int, limit: int = 10) -> List[Dict]:
+        """
+        Async variant of search_items, for callers already on the event loop
+        
+        Runs the same memoized, bucket-signed search in a worker thread, so
+        sync and async callers share one cache.
+        """
+        return await asyncio.to_thread(self.search_items, bbox, year, limit)
+    
     def get_forest_pixels_in_bbox(
         self, 
         bbox: List[float], 
         year: int,
         max_pixels: int = 10000
-    ) -> Tuple[np.ndarray, List[Tuple[float, float]]]:
+    ) -> Tuple[int, np.ndarray]:
         """
         Get forest pixels within a bounding box
         
@@ -101,21 +450,45 @@ class MPCService:
             max_pixels: Maximum pixels to return (for performance)
         
         Returns:
-            Tuple of (forest_mask, pixel_coordinates)
+            Tuple of (forest_pixel_count, pixel_coordinates), where the
+            coordinates are an (N, 2) float32 array of [lat, lon]
         """
         items = self.search_items(bbox, year, limit=1)
         
         if not items:
             logger.warning(f"No MPC items found for bbox {bbox}")
-            return np.array([]), []
+            return 0, _no_coords()
+        
+        return self._read_forest_pixels(items[0], bbox, max_pixels)
+    
+    async def aget_forest_pixels_in_bbox(
+        self,
+        bbox: List[float],
+        year: int,
+        max_pixels: int = 10000
+    ) -> Tuple[int, np.ndarray]:
+        """Async variant of get_forest_pixels_in_bbox (search and raster read run in worker threads)"""
+        
+        items = await self.asearch_items(bbox, year, limit=1)
+        
+        if not items:
+            logger.warning(f"No MPC items found for bbox {bbox}")
+            return 0, _no_coords()
         
-        item = items[0]
-        signed_item = pc.sign(item)
+        return await asyncio.to_thread(self._read_forest_pixels, items[0], bbox, max_pixels)
+    
+    def _read_forest_pixels(
+        self,
+        item: Dict,
+        bbox: List[float],
+        max_pixels: int
+    ) -> Tuple[int, np.ndarray]:
+        """Read and sample forest pixels of a signed STAC item within bbox"""
         
-        data_url = signed_item['assets']['data']['href']
+        data_url = item['assets']['data']['href']
         
         try:
-            with rasterio.open(data_url) as src:
+            with rasterio.Env(**COG_ENV_OPTIONS), _dataset_cache.open(data_url) as src:
                 
                 # Transform bbox to source CRS
                 west, south, east, north = bbox
@@ -136,7 +509,7 @@ class MPCService:
                 
                 if overlap_west >= overlap_east or overlap_south >= overlap_north:
                     logger.warning(f"Bbox doesn't overlap with raster coverage")
-                    return np.array([]), []
+                    return 0, _no_coords()
                 
                 # Use overlap bounds
                 window = from_bounds(
@@ -150,89 +523,207 @@ class MPCService:
                 # Check window validity
                 if window.width <= 0 or window.height <= 0:
                     logger.warning(f"Invalid window size: {window}")
-                    return np.array([]), []
+                    return 0, _no_coords()
                 
-                # Limit window size for performance
+                window = Window(
+                    int(window.col_off),
+                    int(window.row_off),
+                    max(int(window.width), 1),
+                    max(int(window.height), 1)
+                )
+                
+                # Large windows: read the whole overlap decimated instead of a
+                # full-resolution corner of it. Snap up to the coarsest-needed
+                # overview level (never a finer one, which would break the
+                # pixel cap); without one, GDAL resamples to the computed factor
+                factor = 1
                 if window.width * window.height > max_pixels:
-                    scale = np.sqrt(max_pixels / (window.width * window.height))
-                    new_width = int(window.width * scale)
-                    new_height = int(window.height * scale)
+                    factor = int(np.ceil(np.sqrt(window.width * window.height / max_pixels)))
+                    factor = min((f for f in src.overviews(1) if f >= factor), default=factor)
+                
+                if factor > 1:
+                    out_h = max(window.height // factor, 1)
+                    out_w = max(window.width // factor, 1)
                     
-                    window = rasterio.windows.Window(
-                        window.col_off,
-                        window.row_off,
-                        new_width,
-                        new_height
+                    data = src.read(
+                        1,
+                        window=window,
+                        out=_read_buffer((out_h, out_w), src.dtypes[0]),
+                        resampling=Resampling.nearest
                     )
-                    logger.info(f"Limited window to {new_width}x{new_height} pixels")
-                
-                # Read data
-                data = src.read(1, window=window)
+                    logger.info(
+                        f"Read {window.width}x{window.height} window at 1/{factor} "
+                        f"resolution ({out_w}x{out_h} pixels)"
+                    )
+                else:
+                    # Read whole internal blocks, then crop back to the window
+                    block_window = self._snap_to_blocks(window, src)
+                    
+                    bh, bw = src.block_shapes[0]
+                    n_blocks = (
+                        -(-block_window.height // bh) * -(-block_window.width // bw)
+                    )
+                    
+                    if (settings.MPC_PARALLEL_READS
+                            and n_blocks >= settings.MPC_PARALLEL_READ_MIN_BLOCKS):
+                        block_data = self._read_blocks_parallel(data_url, block_window, src)
+                    else:
+                        block_data = src.read(
+                            1,
+                            window=block_window,
+                            out=_read_buffer(
+                                (block_window.height, block_window.width),
+                                src.dtypes[0]
+                            ),
+                            boundless=False
+                        )
+                    
+                    row_start = window.row_off - block_window.row_off
+                    col_start = window.col_off - block_window.col_off
+                    data = block_data[
+                        row_start:row_start + window.height,
+                        col_start:col_start + window.width
+                    ]
                 
                 if data.size == 0:
                     logger.warning(f"Empty data read from window")
-                    return np.array([]), []
+                    return 0, _no_coords()
+                
+                # LULC classes fit in a byte; keep the scan at 1 byte/pixel
+                if data.dtype != np.uint8:
+                    data = data.astype(np.uint8)
                 
                 logger.info(f"Read data shape: {data.shape}")
-                logger.info(f"Unique classes: {np.unique(data)}")
                 
-                # Forest is class 2
-                forest_mask = (data == 2)
-                forest_pixel_count = forest_mask.sum()
+                # Single linear pass for all class counts
+                counts = class_histogram(data)
+                logger.info(f"Unique classes: {np.flatnonzero(counts)}")
+                
+                forest_pixel_count = int(counts[list(FOREST_CLASSES)].sum())
                 
                 logger.info(f"Found {forest_pixel_count} forest pixels")
                 
                 if forest_pixel_count == 0:
-                    return np.array([]), []
+                    return 0, _no_coords()
                 
-                # Sample pixels if too many
-                rows, cols = np.where(forest_mask)
+                # Flat forest indices, no intermediate bool mask.
+                # Cropped block reads are strided views, so flatten once here.
+                flat = np.ascontiguousarray(data).ravel()
+                idx = np.flatnonzero(FOREST_CLASS_LUT[flat])
                 
-                if len(rows) > max_pixels:
-                    indices = np.random.choice(len(rows), max_pixels, replace=False)
-                    rows = rows[indices]
-                    cols = cols[indices]
+                # Sample pixels if too many
+                if forest_pixel_count > max_pixels:
+                    rng = np.random.default_rng()
+                    sel = partial_sample(forest_pixel_count, max_pixels, rng)
+                    idx = idx[sel]
                     logger.info(f"Sampled {max_pixels} pixels from {forest_pixel_count}")
                 
-                # Get coordinates
-                forest_coords = []
+                rows, cols = np.divmod(idx, data.shape[1])
                 
-                for row, col in zip(rows, cols):
-                    pixel_x = window.col_off + col
-                    pixel_y = window.row_off + row
-                    
-                    lon, lat = rasterio.transform.xy(
-                        src.transform,
-                        pixel_y,
-                        pixel_x
-                    )
-                    
-                    # Transform back to WGS84
-                    from pyproj import Transformer
-                    transformer = Transformer.from_crs(
-                        src.crs,
-                        'EPSG:4326',
-                        always_xy=True
-                    )
-                    lon_wgs84, lat_wgs84 = transformer.transform(lon, lat)
-                    
-                    forest_coords.append((lat_wgs84, lon_wgs84))
+                # Get coordinates: apply the affine to pixel centers directly
+                # (rescaled to base-resolution pixels for overview reads)
+                a = src.transform
+                px = window.col_off + (cols + 0.5) * (window.width / data.shape[1])
+                py = window.row_off + (rows + 0.5) * (window.height / data.shape[0])
+                
+                xs_src = a.a * px + a.b * py + a.c
+                ys_src = a.d * px + a.e * py + a.f
+                
+                # Transform back to WGS84
+                transformer = self._get_wgs84_transformer(src.crs)
+                lon_wgs84, lat_wgs84 = transformer.transform(xs_src, ys_src)
+                
+                # Struct-of-arrays (N, 2) float32 [lat, lon]; ~1 m precision is
+                # well below the 10 m LULC pixel size
+                forest_coords = np.stack(
+                    [lat_wgs84.astype(np.float32), lon_wgs84.astype(np.float32)],
+                    axis=1
+                )
                 
                 logger.info(f"Extracted {len(forest_coords)} forest coordinates")
                 
-                return forest_mask, forest_coords
+                return forest_pixel_count, forest_coords
                 
         except Exception as e:
             logger.error(f"Error reading raster: {str(e)}")
-            return np.array([]), []
+            return 0, _no_coords()
+    
+    def get_forest_pixels_multi(
+        self,
+        bboxes: List[List[float]],
+        year: int,
+        max_pixels: int = 10000,
+        max_concurrent: int = 8
+    ) -> List[Tuple[int, np.ndarray]]:
+        """
+        Get forest pixels for several bounding boxes concurrently
+        
+        Each bbox is an independent STAC search + COG read, so they are
+        run on a thread pool. Raster handles come from the shared dataset
+        cache: bboxes that resolve to the same asset reuse one handle and
+        their reads serialize on its lock, so the speed-up comes from
+        overlapping searches and reads of distinct tiles.
+        
+        Args:
+            bboxes: List of [west, south, east, north] in WGS84
+            year: Year to query
+            max_pixels: Maximum pixels to return per bbox
+            max_concurrent: Upper bound on in-flight bboxes, to stay within
+                MPC STAC API rate limits
+        
+        Returns:
+            List of (forest_pixel_count, pixel_coordinates), in bbox order
+        """
+        if not bboxes:
+            return []
+        
+        def fetch(bbox: List[float]) -> Tuple[int, np.ndarray]:
+            try:
+                return self.get_forest_pixels_in_bbox(bbox, year, max_pixels=max_pixels)
+            except Exception as e:
+                logger.warning(f"Forest pixel fetch failed for bbox {bbox}: {e}")
+                return 0, _no_coords()
+        
+        workers = min(max_concurrent, len(bboxes))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fetch, bboxes))
+    
+    async def aget_forest_pixels_multi(
+        self,
+        bboxes: List[List[float]],
+        year: int,
+        max_pixels: int = 10000,
+        max_concurrent: int = 8
+    ) -> List[Tuple[int, np.ndarray]]:
+        """
+        Async variant of get_forest_pixels_multi
+        
+        Up to max_concurrent bboxes are in flight at once; searches and
+        raster reads run in worker threads.
+        
+        Returns:
+            List of (forest_pixel_count, pixel_coordinates), in bbox order
+        """
+        if not bboxes:
+            return []
+        
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def fetch(bbox: List[float]) -> Tuple[int, np.ndarray]:
+            async with semaphore:
+                try:
+                    return await self.aget_forest_pixels_in_bbox(
+                        bbox, year, max_pixels=max_pixels
+                    )
+                except Exception as e:
+                    logger.warning(f"Forest pixel fetch failed for bbox {bbox}: {e}")
+                    return 0, _no_coords()
+        
+        return list(await asyncio.gather(*(fetch(b) for b in bboxes)))
     
     def get_country_bbox(self, country_iso: str) -> Optional[List[float]]:
         """Get bounding box for country"""
         
-        country_bboxes = {
-            "BRA": [-73.9872, -33.7683, -34.7299, 5.2842],
-            "IDN": [95.0, -11.0, 141.0, 6.0],
-            "PAK": [60.87, 23.63, 77.84, 37.08],
-        }
-        
-        return country_bboxes.get(country_iso)
\ No newline at end of file
+        bbox = COUNTRY_BBOXES.get(country_iso)
+        return list(bbox) if bbox else None
@@ -3,13 +3,46 @@ TiTiler Service - Convert MPC STAC items to map tiles
 FIXED: Proper URL generation for Microsoft Planetary Computer
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+from functools import lru_cache
+from urllib.parse import urlencode
 import math
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _build_tile_url(
+    titiler_endpoint: str,
+    collection: str,
+    item_id: str,
+    assets: Tuple[str, ...],
+    rescale: Optional[str],
+    colormap: Optional[str]
+) -> str:
+    """Build (and memoize) a URL-encoded TiTiler tile URL template"""
+    
+    # MPC TiTiler endpoint format
+    tile_url = f"{titiler_endpoint}/item/tiles/WebMercatorQuad/{{z}}/{{x}}/{{y}}.png"
+    
+    params = [("collection", collection), ("item", item_id)]
+    params.extend(("assets", asset) for asset in assets)
+    
+    if rescale:
+        params.append(("rescale", rescale))
+    
+    if colormap:
+        params.append(("colormap_name", colormap))
+    
+    # Performance optimization: bilinear resampling for smoother tiles
+    params.append(("resampling", "bilinear"))
+    
+    return f"{tile_url}?{urlencode(params, doseq=True)}"
+
+
 class TiTilerService:
     """TiTiler service for generating tile URLs from STAC items"""
     
@@ -58,28 +91,14 @@ class TiTilerService:
         """
         
         try:
-            # ✅ CORRECTED: Proper MPC TiTiler endpoint format
-            tile_url = f"{self.titiler_endpoint}/item/tiles/WebMercatorQuad/{{z}}/{{x}}/{{y}}.png"
-            
-            # Build parameters
-            params = []
-            params.append(f"collection={collection}")
-            params.append(f"item={item_id}")
-            
-            for asset in assets:
-                params.append(f"assets={asset}")
-            
-            if rescale:
-                params.append(f"rescale={rescale}")
-            
-            if colormap:
-                params.append(f"colormap_name={colormap}")
-            
-            # Performance optimization: bilinear resampling for smoother tiles
-            params.append("resampling=bilinear")
-            
-            # ✅ CORRECTED: Combine with proper query string
-            full_url = f"{tile_url}?{'&'.join(params)}"
+            full_url = _build_tile_url(
+                self.titiler_endpoint,
+                collection,
+                item_id,
+                tuple(assets),
+                rescale,
+                colormap
+            )
             
             logger.info(f"✅ Generated tile URL for {item_id[:30]}...")
             return full_url
@@ -172,6 +191,8 @@ class TiTilerService:
         """
         Convert lat/lon to tile coordinates.
         
+        Array-like inputs are dispatched to lat_lon_to_tiles.
+        
         Args:
             lat: Latitude
             lon: Longitude
@@ -180,12 +201,35 @@ class TiTilerService:
         Returns:
             (x, y) tile coordinates
         """
+        if np.ndim(lat) or np.ndim(lon):
+            return TiTilerService.lat_lon_to_tiles(lat, lon, zoom)
+        
         lat_rad = math.radians(lat)
         n = 2.0 ** zoom
         x = int((lon + 180.0) / 360.0 * n)
         y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
         return x, y
     
+    @staticmethod
+    def lat_lon_to_tiles(lat, lon, zoom: int) -> tuple:
+        """
+        Vectorized lat/lon to tile coordinates for many points.
+        
+        Args:
+            lat: Array of latitudes
+            lon: Array of longitudes
+            zoom: Zoom level
+        
+        Returns:
+            (x, y) arrays of int32 tile coordinates
+        """
+        lat_rad = np.radians(np.asarray(lat, dtype=np.float64))
+        lon = np.asarray(lon, dtype=np.float64)
+        n = float(1 << zoom)
+        x = ((lon + 180.0) / 360.0 * n).astype(np.int32)
+        y = ((1.0 - np.arcsinh(np.tan(lat_rad)) / np.pi) / 2.0 * n).astype(np.int32)
+        return x, y
+    
     @staticmethod
     def bbox_to_center(bbox: List[float]) -> tuple:
         """
@@ -0,0 +1,30 @@
+"""
+Small numeric kernels for boundary/polygon geometry
+Plain numpy - cheap to import and nothing to compile on the event loop
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+# km² per square degree (~111 km per degree)
+DEG2KM_SQ = 111.0 * 111.0
+
+
+def bbox_area(coords) -> Tuple[float, float, float, float, float]:
+    """
+    Bounding box and approximate bbox area of a lon/lat ring
+
+    Args:
+        coords: (N, 2) array-like of [lon, lat]
+
+    Returns:
+        (min_lon, min_lat, max_lon, max_lat, area_km2)
+    """
+
+    arr = np.asarray(coords, dtype=np.float64)
+
+    (min_lon, min_lat), (max_lon, max_lat) = arr[:, :2].min(axis=0), arr[:, :2].max(axis=0)
+    area_km2 = (max_lon - min_lon) * (max_lat - min_lat) * DEG2KM_SQ
+    return float(min_lon), float(min_lat), float(max_lon), float(max_lat), float(area_km2)
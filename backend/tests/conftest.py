@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: make the backend package (app.*) importable
+"""
+
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
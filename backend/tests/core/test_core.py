@@ -1,7 +1,10 @@
 """Test core logic - Working version"""
 import sys
+import time
 from pathlib import Path
 
+import numpy as np
+
 # Add backend root to Python path
 backend_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(backend_root))
@@ -53,5 +56,41 @@ def test_spatial():
     print("="*60 + "\n")
 
 
+def test_spatial_batch():
+    print("\n" + "="*60)
+    print("🧪 TESTING VECTORIZED SPATIAL OPERATIONS")
+    print("="*60)
+    
+    rng = np.random.default_rng(42)
+    n = 10_000
+    lats = rng.uniform(-60, 60, n)
+    lons = rng.uniform(-179, 179, n)
+    
+    # Test 1: Batch lat/lon to H3 matches the per-point call
+    print(f"\n📍 Test 1: Lat/Lon to H3 Index ({n:,} points)")
+    start = time.perf_counter()
+    cells = spatial_ops.lat_lon_to_h3_vec(lats, lons, 9)
+    elapsed = time.perf_counter() - start
+    assert len(cells) == n
+    for i in range(0, n, 97):
+        assert cells[i] == spatial_ops.lat_lon_to_h3(lats[i], lons[i], 9)
+    print(f"   ✅ {elapsed / n * 1e9:.0f} ns/point")
+    
+    # Test 2: Batch haversine matches the per-point call
+    print(f"\n📍 Test 2: Haversine Distance ({n:,} pairs)")
+    start = time.perf_counter()
+    distances = spatial_ops.haversine_distance_vec(lats, lons, lats[::-1], lons[::-1])
+    elapsed = time.perf_counter() - start
+    for i in range(0, n, 97):
+        expected = spatial_ops.haversine_distance(lats[i], lons[i], lats[n - 1 - i], lons[n - 1 - i])
+        assert abs(distances[i] - expected) < 1e-6
+    print(f"   ✅ {elapsed / n * 1e9:.0f} ns/pair")
+    
+    print("\n" + "="*60)
+    print("🎉 ALL TESTS PASSED!")
+    print("="*60 + "\n")
+
+
 if __name__ == "__main__":
-    test_spatial()
\ No newline at end of file
+    test_spatial()
+    test_spatial_batch()
\ No newline at end of file
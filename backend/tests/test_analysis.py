@@ -6,16 +6,19 @@ This is a simplified test that doesn't require pytest or complex imports.
 Just verifies the analysis.py model works correctly.
 """
 
+import asyncio
 import sys
 import os
-import asyncio
 from datetime import datetime
 
 # Add backend directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Now import from app
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # Import Base from your actual database module
 from app.database import Base
@@ -24,7 +27,7 @@ from app.database import Base
 from app.models.analysis import AnalysisResult
 
 
-async def run_tests():
+def run_tests():
     """Run basic tests on AnalysisResult model."""
     
     print("🧪 GEOWISE Analysis Model - Minimal Test Suite")
@@ -33,22 +36,33 @@ async def run_tests():
     
     # Create in-memory test database
     print("📦 Setting up test database...")
-    engine = create_async_engine(
-        "sqlite+aiosqlite:///:memory:",
-        echo=False
+    # Plain sync engine: no event-loop hop per statement.
+    # StaticPool: every session shares the one in-memory connection
+    engine = create_engine(
+        "sqlite:///:memory:",
+        echo=False,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False}
     )
     
     # Create tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    with engine.begin() as conn:
+        # Nothing here needs to survive a crash; skip fsync and disk journal
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        conn.exec_driver_sql("PRAGMA journal_mode=MEMORY")
+        Base.metadata.create_all(conn)
     
     # Create session maker
-    async_session_maker = async_sessionmaker(
+    session_maker = sessionmaker(
         engine,
-        class_=AsyncSession,
         expire_on_commit=False
     )
     
+    # One session and one outer transaction for the whole run; each test
+    # works inside its own SAVEPOINT and nothing is committed until the end
+    session = session_maker()
+    transaction = session.begin()
+    
     print("✅ Test database ready\n")
     
     # TEST 1: Create Analysis
@@ -56,7 +70,8 @@ async def run_tests():
     print("TEST 1: Create and Save Analysis")
     print("-" * 70)
     
-    async with async_session_maker() as session:
+    # All fixture rows go in with one add_all + flush; later tests only read
+    with session.begin_nested():
         try:
             analysis = AnalysisResult(
                 analysis_type="fire_temperature",
@@ -77,8 +92,67 @@ async def run_tests():
             # Set empty results (good practice)
             analysis.results = {}
             
-            session.add(analysis)
-            await session.commit()
+            json_analysis = AnalysisResult(
+                analysis_type="test_json",
+                region_type="country",
+                region_identifier="TEST",
+                h3_resolution=5,
+                primary_dataset="fires",
+                secondary_dataset="climate",
+                start_date=datetime(2025, 1, 1),
+                end_date=datetime(2025, 1, 31)
+            )
+            
+            # Test datasets property
+            json_analysis.datasets = ["fires", "climate", "forest"]
+            
+            # Test results property
+            json_analysis.results = {
+                "correlation": 0.73,
+                "cells": 125,
+                "details": {"method": "pearson"}
+            }
+            
+            # Cache lookup fixture with specific parameters
+            start_date = datetime(2025, 2, 1)
+            end_date = datetime(2025, 2, 28)
+            
+            cache_analysis = AnalysisResult(
+                analysis_type="fire_temperature",
+                region_type="country",
+                region_identifier="IND",
+                h3_resolution=5,
+                primary_dataset="fires",
+                secondary_dataset="climate",
+                start_date=start_date,
+                end_date=end_date,
+                correlation_coefficient=0.85
+            )
+            
+            api_analysis = AnalysisResult(
+                analysis_type="fire_temperature",
+                analysis_name="API Test",
+                region_type="country",
+                region_identifier="PAK",
+                region_name="Pakistan",
+                h3_resolution=5,
+                primary_dataset="fires",
+                secondary_dataset="climate",
+                start_date=datetime(2025, 1, 1),
+                end_date=datetime(2025, 1, 31),
+                correlation_coefficient=0.73,
+                p_value=0.001,
+                is_significant=True
+            )
+            
+            api_analysis.datasets = ["fires", "climate"]
+            api_analysis.results = {"test": "data"}
+            
+            session.add_all([analysis, json_analysis, cache_analysis, api_analysis])
+            session.flush()
+            
+            # Later reads reload from the database instead of the identity map
+            session.expire_all()
             
             print(f"✅ Created analysis: {analysis.id}")
             print(f"   Type: {analysis.analysis_type}")
@@ -87,6 +161,9 @@ async def run_tests():
             print()
             
             saved_id = analysis.id
+            json_id = json_analysis.id
+            cache_id = cache_analysis.id
+            api_id = api_analysis.id
             
         except Exception as e:
             print(f"❌ TEST 1 FAILED: {e}")
@@ -97,9 +174,9 @@ async def run_tests():
     print("TEST 2: Retrieve Analysis by ID")
     print("-" * 70)
     
-    async with async_session_maker() as session:
+    with session.begin_nested():
         try:
-            result = await session.get(AnalysisResult, saved_id)
+            result = session.get(AnalysisResult, saved_id)
             
             if result is None:
                 print("❌ TEST 2 FAILED: Analysis not found")
@@ -119,34 +196,10 @@ async def run_tests():
     print("TEST 3: JSON Properties (datasets, results)")
     print("-" * 70)
     
-    async with async_session_maker() as session:
+    with session.begin_nested():
         try:
-            analysis = AnalysisResult(
-                analysis_type="test_json",
-                region_type="country",
-                region_identifier="TEST",
-                h3_resolution=5,
-                primary_dataset="fires",
-                secondary_dataset="climate",
-                start_date=datetime(2025, 1, 1),
-                end_date=datetime(2025, 1, 31)
-            )
-            
-            # Test datasets property
-            analysis.datasets = ["fires", "climate", "forest"]
-            
-            # Test results property
-            analysis.results = {
-                "correlation": 0.73,
-                "cells": 125,
-                "details": {"method": "pearson"}
-            }
-            
-            session.add(analysis)
-            await session.commit()
-            
             # Retrieve and verify
-            result = await session.get(AnalysisResult, analysis.id)
+            result = session.get(AnalysisResult, json_id)
             
             if result.datasets != ["fires", "climate", "forest"]:
                 print(f"❌ Datasets mismatch: {result.datasets}")
@@ -170,42 +223,40 @@ async def run_tests():
     print("TEST 4: Cache Lookup")
     print("-" * 70)
     
-    async with async_session_maker() as session:
+    with session.begin_nested():
         try:
-            # Create analysis with specific parameters
-            start_date = datetime(2025, 2, 1)
-            end_date = datetime(2025, 2, 28)
+            # find_cached_analysis is a coroutine on an AsyncSession: copy the
+            # fixture rows into an async in-memory database for this lookup
+            fixture_rows = [
+                dict(row) for row in session.execute(AnalysisResult.__table__.select()).mappings()
+            ]
             
-            analysis = AnalysisResult(
-                analysis_type="fire_temperature",
-                region_type="country",
-                region_identifier="IND",
-                h3_resolution=5,
-                primary_dataset="fires",
-                secondary_dataset="climate",
-                start_date=start_date,
-                end_date=end_date,
-                correlation_coefficient=0.85
-            )
+            async def lookup():
+                async_engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+                try:
+                    async with async_engine.begin() as conn:
+                        await conn.run_sync(Base.metadata.create_all)
+                        await conn.execute(AnalysisResult.__table__.insert(), fixture_rows)
+                    
+                    async with AsyncSession(async_engine) as async_session:
+                        return await AnalysisResult.find_cached_analysis(
+                            async_session,
+                            "fire_temperature",
+                            "IND",
+                            start_date,
+                            end_date,
+                            5
+                        )
+                finally:
+                    await async_engine.dispose()
             
-            session.add(analysis)
-            await session.commit()
-            
-            # Try to find it
-            cached = await AnalysisResult.find_cached_analysis(
-                session,
-                "fire_temperature",
-                "IND",
-                start_date,
-                end_date,
-                5
-            )
+            cached = asyncio.run(lookup())
             
             if cached is None:
                 print("❌ Cache lookup failed: Should have found analysis")
                 return False
             
-            if cached.id != analysis.id:
+            if cached.id != cache_id:
                 print("❌ Cache lookup failed: Wrong analysis returned")
                 return False
             
@@ -275,29 +326,9 @@ async def run_tests():
     print("TEST 6: to_dict() API Response Conversion")
     print("-" * 70)
     
-    async with async_session_maker() as session:
+    with session.begin_nested():
         try:
-            analysis = AnalysisResult(
-                analysis_type="fire_temperature",
-                analysis_name="API Test",
-                region_type="country",
-                region_identifier="PAK",
-                region_name="Pakistan",
-                h3_resolution=5,
-                primary_dataset="fires",
-                secondary_dataset="climate",
-                start_date=datetime(2025, 1, 1),
-                end_date=datetime(2025, 1, 31),
-                correlation_coefficient=0.73,
-                p_value=0.001,
-                is_significant=True
-            )
-            
-            analysis.datasets = ["fires", "climate"]
-            analysis.results = {"test": "data"}
-            
-            session.add(analysis)
-            await session.commit()
+            analysis = session.get(AnalysisResult, api_id)
             
             # Convert to dict
             result_dict = analysis.to_dict()
@@ -325,7 +356,9 @@ async def run_tests():
             return False
     
     # Cleanup
-    await engine.dispose()
+    transaction.commit()
+    session.close()
+    engine.dispose()
     
     return True
 
@@ -333,7 +366,7 @@ async def run_tests():
 def main():
     """Run all tests."""
     try:
-        success = asyncio.run(run_tests())
+        success = run_tests()
         
         print("=" * 70)
         if success:
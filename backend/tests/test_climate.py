@@ -2,7 +2,8 @@
 Test filtering GFW data by loss driver to match PRODES deforestation
 """
 
-import requests
+import asyncio
+import httpx
 
 GFW_API_KEY = "8e5b3b69-fa31-4eef-af79-eec9674c7014"
 BASE_URL = "https://data-api.globalforestwatch.org"
@@ -18,10 +19,9 @@ print("="*70)
 
 url = f"{BASE_URL}/dataset/gadm__tcl__iso_change/latest/query/json"
 
-# Test 1: See what loss drivers exist
-print("\nTest 1: What loss drivers are recorded for Brazil 2019?")
-print("-"*70)
+# The two queries are independent; send them concurrently over one client
 
+# Test 1: all loss drivers
 sql1 = """
 SELECT 
     v20250515.wri_google_tree_cover_loss_drivers__category as driver,
@@ -34,7 +34,41 @@ GROUP BY v20250515.wri_google_tree_cover_loss_drivers__category
 ORDER BY total_loss_ha DESC
 """
 
-response1 = requests.post(url, headers=headers, json={"sql": sql1.strip()}, timeout=30)
+# Tests 2 and 3: commodity-only and non-wildfire totals in one table pass
+sql2 = """
+SELECT 
+    SUM(v20250515.umd_tree_cover_loss__ha)
+        FILTER (WHERE v20250515.wri_google_tree_cover_loss_drivers__category = 'Commodity driven deforestation')
+        as commodity_loss_ha,
+    COUNT(*)
+        FILTER (WHERE v20250515.wri_google_tree_cover_loss_drivers__category = 'Commodity driven deforestation')
+        as commodity_row_count,
+    SUM(v20250515.umd_tree_cover_loss__ha)
+        FILTER (WHERE v20250515.wri_google_tree_cover_loss_drivers__category NOT IN ('Wildfire'))
+        as non_fire_loss_ha,
+    COUNT(*)
+        FILTER (WHERE v20250515.wri_google_tree_cover_loss_drivers__category NOT IN ('Wildfire'))
+        as non_fire_row_count,
+    SUM(v20250515.umd_tree_cover_loss__ha) as total_loss_ha
+FROM v20250515
+WHERE v20250515.iso = 'BRA'
+AND v20250515.umd_tree_cover_loss__year = 2019
+"""
+
+async def run_queries():
+    transport = httpx.AsyncHTTPTransport(retries=3)
+    async with httpx.AsyncClient(headers=headers, timeout=30, transport=transport) as client:
+        return await asyncio.gather(*(
+            client.post(url, json={"sql": sql.strip()})
+            for sql in (sql1, sql2)
+        ))
+
+
+response1, response2 = asyncio.run(run_queries())
+
+# Test 1: See what loss drivers exist
+print("\nTest 1: What loss drivers are recorded for Brazil 2019?")
+print("-"*70)
 
 if response1.status_code == 200:
     data1 = response1.json().get("data", [])
@@ -56,24 +90,12 @@ print("\n" + "="*70)
 print("Test 2: Filter by 'Commodity driven deforestation'")
 print("-"*70)
 
-sql2 = """
-SELECT 
-    SUM(v20250515.umd_tree_cover_loss__ha) as total_loss_ha,
-    COUNT(*) as row_count
-FROM v20250515
-WHERE v20250515.iso = 'BRA'
-AND v20250515.umd_tree_cover_loss__year = 2019
-AND v20250515.wri_google_tree_cover_loss_drivers__category = 'Commodity driven deforestation'
-"""
-
-response2 = requests.post(url, headers=headers, json={"sql": sql2.strip()}, timeout=30)
-
 if response2.status_code == 200:
     data2 = response2.json().get("data", [])
     if data2:
         row = data2[0]
-        loss = float(row.get('total_loss_ha', 0))
-        count = int(row.get('row_count', 0))
+        loss = float(row.get('commodity_loss_ha') or 0)
+        count = int(row.get('commodity_row_count') or 0)
         
         print(f"✅ Commodity-driven deforestation only:")
         print(f"   Loss: {loss:,.2f} ha")
@@ -96,24 +118,12 @@ print("\n" + "="*70)
 print("Test 3: Exclude Wildfires (to isolate human deforestation)")
 print("-"*70)
 
-sql3 = """
-SELECT 
-    SUM(v20250515.umd_tree_cover_loss__ha) as total_loss_ha,
-    COUNT(*) as row_count
-FROM v20250515
-WHERE v20250515.iso = 'BRA'
-AND v20250515.umd_tree_cover_loss__year = 2019
-AND v20250515.wri_google_tree_cover_loss_drivers__category NOT IN ('Wildfire')
-"""
-
-response3 = requests.post(url, headers=headers, json={"sql": sql3.strip()}, timeout=30)
-
-if response3.status_code == 200:
-    data3 = response3.json().get("data", [])
+if response2.status_code == 200:
+    data3 = response2.json().get("data", [])
     if data3:
         row = data3[0]
-        loss = float(row.get('total_loss_ha', 0))
-        count = int(row.get('row_count', 0))
+        loss = float(row.get('non_fire_loss_ha') or 0)
+        count = int(row.get('non_fire_row_count') or 0)
         
         print(f"✅ Excluding wildfires:")
         print(f"   Loss: {loss:,.2f} ha")
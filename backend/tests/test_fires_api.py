@@ -1,14 +1,12 @@
 """Minimal NASA FIRMS API Test"""
-import asyncio
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import pytest
 
 from app.services.nasa_firms import NASAFIRMSService
 from app.schemas.common import BoundingBox
 from app.config import settings
 
 
+@pytest.mark.asyncio
 async def test_api():
     if not settings.NASA_FIRMS_API_KEY:
         print("❌ NASA_FIRMS_API_KEY not found in .env")
@@ -38,7 +36,3 @@ async def test_api():
             print(f"  Confidence: {fire.confidence}")
         else:
             print("⚠️ No fires found in this region")
-
-
-if __name__ == "__main__":
-    asyncio.run(test_api())
\ No newline at end of file
@@ -8,25 +8,35 @@ Fixed version that:
 3. Tests hexagons with fires in MPC-covered areas
 """
 
+import os
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import asyncio
 import time
-from collections import defaultdict
+import threading
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import numpy as np
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, lambda_stmt
 import h3
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import rasterio
 from rasterio.windows import from_bounds
 from rasterio.warp import transform_bounds
+from rasterio.enums import Resampling
 import planetary_computer as pc
+from shapely.geometry import box, shape
+from shapely.strtree import STRtree
 
 from app.database import init_db, database_manager
 from app.models.fires import FireDetection
+from app.services.mpc_service import COG_ENV_OPTIONS
 
 
 # ============================================================================
@@ -41,117 +51,287 @@ AMAZON_BOUNDS = {
 }
 
 
-async def get_amazon_fires(year: int = 2019):
-    """Get fires from Amazon region only (where MPC has coverage)."""
+async def get_amazon_fires_by_hex(year: int = 2019, on_leaders=None, n_leaders: int = 10) -> dict:
+    """
+    Get Amazon fires aggregated per H3 hexagon.
+    Counting and FRP sums happen in SQL, so only one row per hex is fetched.
+    Returns column arrays: h3_index, count, total_frp, lat, lon.
+    
+    Rows arrive busiest-first, so on_leaders (if given) is called with the
+    top n_leaders (h3_index, data) pairs as soon as the first batch lands.
+    GROUP BY + ORDER BY count means SQLite finishes the whole aggregate
+    and sort before that first batch, so this only overlaps the MPC work
+    with fetching the remaining (already computed) rows, not with the scan.
+    """
     
     print(f"\n📂 Reading fires from Amazon region...")
     print(f"   Region: Lat {AMAZON_BOUNDS['lat_min']} to {AMAZON_BOUNDS['lat_max']}")
     print(f"           Lon {AMAZON_BOUNDS['lon_min']} to {AMAZON_BOUNDS['lon_max']}")
     print(f"   Year: {year}")
     
+    # Plain locals so the lambda statement binds them as parameters;
+    # a half-open date range lets the acq_date index be used, and the
+    # lat/lon range is covered by idx_fires_location
+    year_start = datetime(year, 1, 1)
+    year_end = datetime(year + 1, 1, 1)
+    lat_min, lat_max = AMAZON_BOUNDS['lat_min'], AMAZON_BOUNDS['lat_max']
+    lon_min, lon_max = AMAZON_BOUNDS['lon_min'], AMAZON_BOUNDS['lon_max']
+    
     async with database_manager.async_session_maker() as session:
-        query = select(
-            FireDetection.latitude,
-            FireDetection.longitude,
+        # lambda_stmt caches the compiled SQL across calls
+        query = lambda_stmt(lambda: select(
             FireDetection.h3_index_5,
-            FireDetection.frp
+            func.count().label('cnt'),
+            func.coalesce(func.sum(FireDetection.frp), 0).label('frp_sum'),
+            # With a single max() aggregate, SQLite takes bare columns from
+            # the row holding that max: the sample is the hex's strongest fire
+            FireDetection.latitude.label('sample_lat'),
+            FireDetection.longitude.label('sample_lon'),
+            func.max(FireDetection.frp).label('peak_frp')
         ).where(
             and_(
                 FireDetection.country == 'BRA',
-                func.extract('year', FireDetection.acq_date) == year,
-                FireDetection.latitude >= AMAZON_BOUNDS['lat_min'],
-                FireDetection.latitude <= AMAZON_BOUNDS['lat_max'],
-                FireDetection.longitude >= AMAZON_BOUNDS['lon_min'],
-                FireDetection.longitude <= AMAZON_BOUNDS['lon_max']
+                FireDetection.acq_date >= year_start,
+                FireDetection.acq_date < year_end,
+                FireDetection.latitude.between(lat_min, lat_max),
+                FireDetection.longitude.between(lon_min, lon_max)
             )
-        )
+        ).group_by(FireDetection.h3_index_5).order_by(func.count().desc()))
         
-        result = await session.execute(query)
-        fires = result.all()
+        # Stream column rows in fixed-size batches instead of buffering
+        # the whole result
+        result = await session.stream(query, execution_options={'yield_per': 1000})
         
-        print(f"   ✅ Found {len(fires):,} fires in Amazon region")
-        return fires
-
-
-def group_fires_by_hex(fires: list) -> dict:
-    """Group fires by H3 hexagon."""
-    
-    print(f"\n🔷 Grouping into H3 hexagons...")
-    
-    hex_data = defaultdict(lambda: {'count': 0, 'total_frp': 0.0, 'fires': []})
+        columns = ([], [], [], [], [])
+        async for partition in result.partitions(1000):
+            if on_leaders is not None and not columns[0]:
+                on_leaders([
+                    (h3_5, {'count': cnt, 'total_frp': float(frp_sum), 'sample': (lat, lon)})
+                    for h3_5, cnt, frp_sum, lat, lon, _peak_frp in partition[:n_leaders]
+                ])
+            
+            # peak_frp only selects the sample row; zip drops it
+            for column, values in zip(columns, zip(*partition)):
+                column.extend(values)
     
-    for lat, lon, h3_5, frp in fires:
-        hex_data[h3_5]['count'] += 1
-        hex_data[h3_5]['total_frp'] += (frp or 0)
-        hex_data[h3_5]['fires'].append((lat, lon, frp))
+    # Struct-of-arrays: one NumPy column per field instead of a dict per hex
+    h3_ids, counts, frp_sums, lats, lons = columns
+    hex_data = {
+        'h3_index': h3_ids,
+        'count': np.asarray(counts, dtype=np.int64),
+        'total_frp': np.asarray(frp_sums, dtype=np.float64),
+        'lat': np.asarray(lats, dtype=np.float32),
+        'lon': np.asarray(lons, dtype=np.float32)
+    }
     
-    print(f"   ✅ Grouped into {len(hex_data):,} hexagons")
+    print(f"   ✅ Found {int(hex_data['count'].sum()):,} fires in {len(h3_ids):,} hexagons")
     
     # Show top hexagons
-    top = sorted(hex_data.items(), key=lambda x: x[1]['count'], reverse=True)[:5]
+    top = top_hexes_by_count(hex_data, 5)
     print(f"\n   Top 5 hexagons by fire count:")
     for h3_idx, data in top:
-        sample_fire = data['fires'][0]
+        sample_fire = data['sample']
         print(f"      {h3_idx}: {data['count']:,} fires at ({sample_fire[0]:.2f}, {sample_fire[1]:.2f})")
     
-    return dict(hex_data)
+    return hex_data
 
 
-def get_hex_bbox(h3_index: str) -> list:
+def top_hexes_by_count(hex_data: dict, n: int) -> list:
+    """
+    Top-n (h3_index, data) pairs by fire count, without sorting every hex.
+    Per-hex dicts are only built for the n hexes returned.
+    """
+    counts = hex_data['count']
+    
+    if len(counts) > n:
+        top = np.argpartition(counts, -n)[-n:]
+    else:
+        top = np.arange(len(counts))
+    
+    top = top[np.argsort(-counts[top], kind='stable')]
+    return [
+        (hex_data['h3_index'][i], {
+            'count': int(counts[i]),
+            'total_frp': float(hex_data['total_frp'][i]),
+            'sample': (float(hex_data['lat'][i]), float(hex_data['lon'][i]))
+        })
+        for i in top
+    ]
+
+
+# Keep-alive session for STAC searches
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.2)
+))
+
+# Politeness limit for MPC requests (replaces a fixed sleep between hexes)
+MPC_QUERIES_PER_SECOND = 5
+
+
+class AsyncRateLimiter:
+    """Token bucket: at most max_rate acquisitions per time_period seconds."""
+    
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def __aenter__(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                refill = (now - self._updated) * self.max_rate / self.time_period
+                self._tokens = min(self.max_rate, self._tokens + refill)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return self
+                
+                await asyncio.sleep((1 - self._tokens) * self.time_period / self.max_rate)
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+# Per-thread scratch arrays for window reads, sized for the largest window
+MAX_WINDOW_PIXELS = 100_000
+_buffers = threading.local()
+
+
+def _window_buffer(name: str, shape: tuple, dtype) -> np.ndarray:
+    """Reusable per-thread array of the given shape, backed by one flat buffer."""
+    dtype = np.dtype(dtype)
+    key = (name, dtype)
+    
+    cache = getattr(_buffers, 'arrays', None)
+    if cache is None:
+        cache = _buffers.arrays = {}
+    
+    if key not in cache:
+        cache[key] = np.empty(MAX_WINDOW_PIXELS, dtype=dtype)
+    
+    return cache[key][:shape[0] * shape[1]].reshape(shape)
+
+
+def _hex_boundary(h3_index: str) -> tuple:
+    """Boundary of an H3 hexagon as (lat, lon) tuples."""
+    if hasattr(h3, 'cell_to_boundary'):
+        return h3.cell_to_boundary(h3_index)
+    return h3.h3_to_geo_boundary(h3_index, geo_json=True)
+
+
+@lru_cache(maxsize=None)
+def get_hex_bbox(h3_index: str) -> tuple:
     """
     Get bbox [west, south, east, north] for H3 hexagon.
     CRITICAL: Bbox is [lon, lat, lon, lat] NOT [lat, lon, lat, lon]!
+    Cached (hex bounds never change), so it is returned as a tuple.
     """
-    if hasattr(h3, 'cell_to_boundary'):
-        boundary = h3.cell_to_boundary(h3_index)
-    else:
-        boundary = h3.h3_to_geo_boundary(h3_index, geo_json=True)
+    boundary = _hex_boundary(h3_index)
     
     # Boundary is list of (lat, lon) tuples
     lats = [coord[0] for coord in boundary]
     lons = [coord[1] for coord in boundary]
     
     # Bbox format: [west, south, east, north] = [min_lon, min_lat, max_lon, max_lat]
-    bbox = [min(lons), min(lats), max(lons), max(lats)]
+    bbox = (min(lons), min(lats), max(lons), max(lats))
     
     return bbox
 
 
-def query_mpc_for_hex(h3_index: str, year: int, fire_sample: tuple) -> dict:
+def get_hex_bboxes(hex_ids: list) -> np.ndarray:
+    """(N, 4) array of [west, south, east, north] for many hexagons in one pass."""
+    if not hex_ids:
+        return np.empty((0, 4))
+    
+    boundaries = [_hex_boundary(h) for h in hex_ids]
+    n_vertices = max(len(b) for b in boundaries)
+    
+    # Pentagons have 5 vertices; repeat the first one so the array is rectangular
+    coords = np.array(
+        [list(b) + [b[0]] * (n_vertices - len(b)) for b in boundaries],
+        dtype=np.float64
+    )
+    lats, lons = coords[:, :, 0], coords[:, :, 1]
+    
+    return np.stack([lons.min(axis=1), lats.min(axis=1), lons.max(axis=1), lats.max(axis=1)], axis=1)
+
+
+def prefetch_stac_items(hex_bboxes: list, year: int) -> tuple:
+    """
+    Run one STAC search over the union of all hex bboxes.
+    Returns (STRtree over item footprints, items) for local per-hex lookups.
+    """
+    hex_bboxes = np.asarray(hex_bboxes, dtype=np.float64).reshape(-1, 4)
+    union_bbox = [*hex_bboxes[:, :2].min(axis=0).tolist(), *hex_bboxes[:, 2:].max(axis=0).tolist()]
+    
+    stac_url = "https://planetarycomputer.microsoft.com/api/stac/v1/search"
+    body = {
+        "collections": ["io-lulc-annual-v02"],
+        "bbox": union_bbox,
+        "datetime": f"{year}-01-01/{year}-12-31",
+        "limit": 100
+    }
+    
+    items = []
+    
+    # Follow "next" links in case the union covers more than one page
+    while body is not None:
+        response = SESSION.post(stac_url, json=body, timeout=30)
+        
+        if response.status_code != 200:
+            break
+        
+        page = response.json()
+        items.extend(page.get('features', []))
+        
+        next_link = next((l for l in page.get('links', []) if l.get('rel') == 'next'), None)
+        body = next_link.get('body') if next_link else None
+    
+    tree = STRtree([shape(item['geometry']) for item in items])
+    
+    return tree, items
+
+
+def hex_candidate_items(h3_index: str, stac_index: tuple) -> list:
+    """Signed STAC items from a prefetched stac_index that intersect a hexagon."""
+    tree, all_items = stac_index
+    hits = sorted(tree.query(box(*get_hex_bbox(h3_index)), predicate='intersects'))
+    return [pc.sign(all_items[i]) for i in hits]
+
+
+def query_mpc_for_hex(h3_index: str, year: int, fire_sample: tuple,
+                      stac_index: tuple = None, items: list = None) -> dict:
     """
     Query MPC for forest data in a hexagon.
     Now with better error handling and trying all items.
+    Candidate items come from `items` (already signed) or a prefetched stac_index.
     """
     bbox = get_hex_bbox(h3_index)
     
     try:
-        # Search STAC
-        stac_url = "https://planetarycomputer.microsoft.com/api/stac/v1/search"
-        search_params = {
-            "collections": ["io-lulc-annual-v02"],
-            "bbox": bbox,
-            "datetime": f"{year}-01-01/{year}-12-31",
-            "limit": 5
-        }
-        
-        response = requests.post(stac_url, json=search_params, timeout=30)
-        
-        if response.status_code != 200:
-            return None
-        
-        items = response.json().get('features', [])
+        if items is None:
+            if stac_index is None:
+                stac_index = prefetch_stac_items([bbox], year)
+            items = hex_candidate_items(h3_index, stac_index)
         
         if not items:
             return None
         
-        # Try each item until we find one that works
+        # Try each item until we find one that works. Items are already
+        # signed, so worker processes never fetch SAS tokens themselves
         for item in items:
             try:
-                signed_item = pc.sign(item)
-                data_url = signed_item['assets']['data']['href']
+                data_url = item['assets']['data']['href']
                 
                 # Read data
-                with rasterio.open(data_url) as src:
+                with rasterio.Env(**COG_ENV_OPTIONS), rasterio.open(data_url) as src:
                     west, south, east, north = bbox
                     transformed = transform_bounds('EPSG:4326', src.crs, west, south, east, north)
                     
@@ -172,25 +352,31 @@ def query_mpc_for_hex(h3_index: str, year: int, fire_sample: tuple) -> dict:
                         src.transform
                     )
                     
-                    # Limit size for speed
-                    max_pixels = 100_000
-                    if window.width * window.height > max_pixels:
-                        scale = np.sqrt(max_pixels / (window.width * window.height))
-                        window = rasterio.windows.Window(
-                            window.col_off, window.row_off,
-                            int(window.width * scale),
-                            int(window.height * scale)
-                        )
+                    # Whole pixels, so the shape matches the reusable buffer
+                    window = window.round_offsets().round_lengths()
+                    shape = (int(window.height), int(window.width))
                     
-                    # Read data
-                    data = src.read(1, window=window)
+                    # Limit size for speed: decimate the whole window (GDAL
+                    # serves this from a COG overview) instead of cropping it
+                    max_pixels = MAX_WINDOW_PIXELS
+                    if shape[0] * shape[1] > max_pixels:
+                        scale = np.sqrt(max_pixels / (shape[0] * shape[1]))
+                        shape = (int(shape[0] * scale), int(shape[1] * scale))
                     
-                    if data.size == 0:
+                    if shape[0] * shape[1] == 0:
                         continue
                     
+                    # Read data
+                    data = src.read(
+                        1,
+                        window=window,
+                        out=_window_buffer('data', shape, src.dtypes[0]),
+                        resampling=Resampling.nearest
+                    )
+                    
                     # Calculate forest %
                     total = data.size
-                    forest = (data == 2).sum()
+                    forest = np.count_nonzero(np.equal(data, 2, out=_window_buffer('mask', shape, np.bool_)))
                     forest_pct = (forest / total) * 100
                     
                     return {
@@ -211,6 +397,46 @@ def query_mpc_for_hex(h3_index: str, year: int, fire_sample: tuple) -> dict:
         return None
 
 
+def timed_query_mpc_for_hex(h3_index: str, year: int, fire_sample: tuple, items: list) -> tuple:
+    """query_mpc_for_hex plus its wall time, as a picklable worker entry point."""
+    start = time.time()
+    forest_data = query_mpc_for_hex(h3_index, year, fire_sample, items=items)
+    return forest_data, time.time() - start
+
+
+async def query_top_hexes(top_hexes: list, year: int) -> list:
+    """
+    Query MPC for every hexagon concurrently.
+    Returns (forest_data, elapsed) per hexagon, in input order.
+    """
+    # One STAC search covering every tested hexagon
+    bboxes = get_hex_bboxes([h for h, _ in top_hexes])
+    stac_index = await asyncio.to_thread(prefetch_stac_items, bboxes, year)
+    print(f"   Prefetched {len(stac_index[1])} MPC items")
+    
+    # Hex reads decode GeoTIFF blocks and count pixels, so spread them over
+    # processes; items are signed here so workers never call the SAS API.
+    # Start at most MPC_QUERIES_PER_SECOND of them per second
+    loop = asyncio.get_running_loop()
+    limiter = AsyncRateLimiter(MPC_QUERIES_PER_SECOND, 1.0)
+    workers = min(len(top_hexes), os.cpu_count() or 1)
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        
+        async def limited_query(h3_idx: str, sample_fire: tuple) -> tuple:
+            items = await asyncio.to_thread(hex_candidate_items, h3_idx, stac_index)
+            async with limiter:
+                pass
+            return await loop.run_in_executor(
+                pool, timed_query_mpc_for_hex, h3_idx, year, sample_fire, items
+            )
+        
+        return await asyncio.gather(*[
+            limited_query(h3_idx, fire_info['sample'])
+            for h3_idx, fire_info in top_hexes
+        ])
+
+
 async def test_amazon_fire_forest_overlap():
     """Test fire-forest overlap for Amazon region fires."""
     
@@ -226,35 +452,37 @@ async def test_amazon_fire_forest_overlap():
     
     await init_db()
     
-    # Get Amazon fires
-    fires = await get_amazon_fires(2019)
+    # Get Amazon fires, grouped by hexagon. MPC queries for the top 10
+    # start as soon as the first batch arrives, overlapping the fetch of
+    # the remaining hex rows (the aggregate itself is already complete)
+    top_hexes = []
+    mpc_task = None
     
-    if not fires:
-        print("\n❌ No fires found in Amazon region!")
-        return
+    def start_mpc_queries(leaders: list):
+        nonlocal mpc_task
+        top_hexes.extend(leaders)
+        mpc_task = asyncio.create_task(query_top_hexes(leaders, 2019))
     
-    # Group by hexagon
-    hex_data = group_fires_by_hex(fires)
+    hex_data = await get_amazon_fires_by_hex(2019, on_leaders=start_mpc_queries, n_leaders=10)
     
-    # Test top 10 hexagons
-    top_hexes = sorted(hex_data.items(), key=lambda x: x[1]['count'], reverse=True)[:10]
+    if not hex_data['h3_index']:
+        print("\n❌ No fires found in Amazon region!")
+        return
     
     print(f"\n🎯 Testing TOP 10 Amazon hexagons...")
     print("="*70)
     
+    outcomes = await mpc_task
+    
     results = []
     
-    for i, (h3_idx, fire_info) in enumerate(top_hexes, 1):
-        sample_fire = fire_info['fires'][0]
+    for i, ((h3_idx, fire_info), (forest_data, elapsed)) in enumerate(zip(top_hexes, outcomes), 1):
+        sample_fire = fire_info['sample']
         
         print(f"\n[{i}/10] Hex: {h3_idx}")
         print(f"        Fires: {fire_info['count']:,}")
         print(f"        Location: ({sample_fire[0]:.2f}, {sample_fire[1]:.2f})")
         
-        start = time.time()
-        forest_data = query_mpc_for_hex(h3_idx, 2019, sample_fire)
-        elapsed = time.time() - start
-        
         if forest_data:
             print(f"        ✅ Forest: {forest_data['forest_pct']:.1f}% ({elapsed:.1f}s)")
             
@@ -268,8 +496,6 @@ async def test_amazon_fire_forest_overlap():
             })
         else:
             print(f"        ❌ MPC query failed ({elapsed:.1f}s)")
-        
-        time.sleep(0.5)
     
     # Summary
     print("\n" + "="*70)
@@ -300,7 +526,7 @@ async def test_amazon_fire_forest_overlap():
         
         # Extrapolate
         success_rate = len(results) / 10
-        total_amazon_hexes = len(hex_data)
+        total_amazon_hexes = len(hex_data['h3_index'])
         estimated_successful = int(total_amazon_hexes * success_rate)
         estimated_time = (estimated_successful * avg_time) / 60
         
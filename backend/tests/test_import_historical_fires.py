@@ -0,0 +1,90 @@
+"""
+GEOWISE - Historical Fire Import Tests
+tests/test_import_historical_fires.py
+
+Checks the bulk-load write path of scripts/import_historical_fires.py:
+with FASTLOAD_PRAGMAS applied, a chunk whose executemany fails part-way
+must roll back completely so the shared session can keep importing.
+"""
+
+import asyncio
+import sqlite3
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2] / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import import_historical_fires as importer  # noqa: E402
+from app.models import FireDetection  # noqa: E402
+
+
+def _row(latitude):
+    """One INSERT_COLUMNS-ordered row; latitude=None violates NOT NULL."""
+    values = {
+        "id": str(uuid.uuid4()),
+        "latitude": latitude,
+        "longitude": 70.0,
+        "country": "PAK",
+        "h3_index_12": "8c42408b62001ff",
+        "h3_index_9": "8942408b623ffff",
+        "h3_index_6": "8642408b7ffffff",
+        "h3_index_5": "8542408bfffffff",
+        "brightness": 330.5,
+        "frp": 4.2,
+        "confidence": "n",
+        "scan": 0.4,
+        "track": 0.4,
+        "satellite": "N",
+        "instrument": "VIIRS",
+        "acq_date": "2023-01-01 00:00:00.000000",
+        "year": 2023,
+        "acq_time": "0830",
+        "daynight": "D",
+    }
+    return tuple(values[column] for column in importer.INSERT_COLUMNS)
+
+
+async def _failed_batch_leaves_no_rows(db_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    event.listen(engine.sync_engine, "connect", importer._fastload_pragmas)
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(FireDetection.__table__.create)
+
+        async with AsyncSession(engine) as session:
+            journal_mode = (await session.execute(text("PRAGMA journal_mode"))).scalar()
+            assert journal_mode.lower() != "off", "bulk load needs a rollback journal"
+            await session.commit()
+
+            # Same sequence as FireImporter.import_csv: raw executemany,
+            # rollback on failure, then the session is reused
+            driver = await importer.FireImporter._driver_connection(session)
+            with pytest.raises(sqlite3.IntegrityError):
+                await driver.executemany(importer._INSERT_SQL, [_row(30.0), _row(31.0), _row(None)])
+            await session.rollback()
+
+            count = (await session.execute(text("SELECT COUNT(*) FROM fire_detections"))).scalar()
+            assert count == 0, f"failed batch left {count} rows behind"
+
+            # The shared session keeps working for the next chunk
+            driver = await importer.FireImporter._driver_connection(session)
+            await driver.executemany(importer._INSERT_SQL, [_row(32.0)])
+            await session.commit()
+
+            count = (await session.execute(text("SELECT COUNT(*) FROM fire_detections"))).scalar()
+            assert count == 1
+    finally:
+        await engine.dispose()
+
+
+def test_failed_batch_rolls_back(tmp_path):
+    """A chunk that fails mid-executemany must not leave partial rows"""
+    asyncio.run(_failed_batch_leaves_no_rows(tmp_path / "fires.db"))
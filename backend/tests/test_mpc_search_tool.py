@@ -5,22 +5,115 @@ Run: python test_boundary_global_standalone.py
 """
 
 import asyncio
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import io
+from collections import Counter
+import time
 
 # Use the exact same class from production
 import httpx
 from typing import Optional, Dict, Any, List
+import hashlib
+import numpy as np
+from functools import lru_cache
+import json
 import math
+from pathlib import Path
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# httpx only speaks HTTP/2 when the h2 package is installed
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Parsed boundaries from earlier runs, so repeat runs skip Nominatim
+CACHE_DIR = Path.home() / ".cache" / "geowise" / "boundary"
+
+_TYPE_RADIUS = {"city": 15, "town": 8, "village": 3, "suburb": 5,
+                "municipality": 12, "administrative": 20}
+
+_HARDCODED_BOUNDARIES = {
+    "lahore": {
+        "lons": np.array([74.1847, 74.4462, 74.5051, 74.4380, 74.2431,
+                          74.0847, 73.9993, 74.0993, 74.1847]),
+        "lats": np.array([31.6340, 31.6217, 31.4732, 31.3204, 31.2641,
+                          31.3455, 31.4903, 31.5903, 31.6340]),
+        "bbox": np.array([73.9993, 31.2641, 74.5051, 31.6340]),
+        "area": 1772.0
+    }
+}
+
+
+def _loads(content: bytes) -> Any:
+    """Parse a JSON response body (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# ~111 km per degree: km² per square degree, and degrees per km
+_DEG2KM_SQ = 111.0 * 111.0
+_KM2DEG = 1.0 / 111.0
 
 
 class BoundaryService:
-    """Copy of production boundary service for testing"""
+    """Copy of production boundary service for testing, plus a probe() fail-fast for batch runs"""
+    
+    _HEADERS = {"User-Agent": "GeoWise-AI/1.0"}
     
     def __init__(self):
         self.nominatim_url = "https://nominatim.openstreetmap.org"
         self.timeout = 30.0
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Nominatim usage policy: max 1 request/second, shared by all strategies
+        self._nominatim_sem = asyncio.Semaphore(1)
+        self._min_interval = 1.0
+        self._last_call = 0.0
+        self._online = True
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers=self._HEADERS,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared client"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    async def _nominatim_get(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        """GET from Nominatim: one request in flight, at most one per second"""
+        async with self._nominatim_sem:
+            wait = self._min_interval - (time.monotonic() - self._last_call)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await self._get_client().get(f"{self.nominatim_url}{path}", params=params)
+            finally:
+                self._last_call = time.monotonic()
+    
+    async def probe(self) -> bool:
+        """Cheap reachability check; also warms the pooled connection"""
+        try:
+            response = await self._get_client().head(self.nominatim_url, timeout=3.0)
+            self._online = response.status_code < 500
+        except httpx.HTTPError:
+            self._online = False
+        return self._online
     
     async def get_city_boundary(
         self,
@@ -30,14 +123,21 @@ class BoundaryService:
     ) -> Optional[Dict[str, Any]]:
         """Get boundary with fallback strategies"""
         
+        key = self._cache_key(city_name, country)
+        cached = self._cache_get(key)
+        if cached:
+            return cached
+        
         # Strategy 1: Polygon
         result = await self._fetch_nominatim_boundary(city_name, country)
         if result:
+            self._cache_set(key, result)
             return result
         
         # Strategy 2: Point expansion
         result = await self._fetch_nominatim_point_expanded(city_name, country)
         if result:
+            self._cache_set(key, result)
             return result
         
         # Strategy 3: Hardcoded
@@ -47,20 +147,58 @@ class BoundaryService:
         
         return None
     
+    @staticmethod
+    def _cache_key(city_name: str, country: Optional[str]) -> str:
+        """Stable file name for a (city, country) pair"""
+        raw = f"{city_name.lower().strip()}|{(country or '').lower().strip()}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+        """Read a cached boundary, if any"""
+        path = CACHE_DIR / f"{key}.json"
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def _cache_set(key: str, value: Dict[str, Any]):
+        """Store a fetched boundary (best effort)"""
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            (CACHE_DIR / f"{key}.json").write_text(json.dumps(value), encoding="utf-8")
+        except OSError:
+            pass
+    
     async def _fetch_nominatim_boundary(self, city_name: str, country: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Fetch polygon from Nominatim"""
+        if not self._online:
+            return None
+        
         try:
             search_query = f"{city_name}, {country}" if country else city_name
-            params = {"q": search_query, "format": "json", "polygon_geojson": 1, "limit": 10}
-            
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.nominatim_url}/search", params=params,
-                                          headers={"User-Agent": "GeoWise-AI/1.0"})
-            
+            params = {"q": search_query, "format": "json", "limit": 5}
+
+            response = await self._nominatim_get("/search", params)
+
             if response.status_code != 200:
                 return None
-            
-            results = response.json()
+
+            # Only relations/ways can carry a polygon; fetch it for the best one
+            candidates = [r for r in _loads(response.content) if r.get("osm_type") in ("relation", "way")]
+            if not candidates:
+                return None
+
+            best = max(candidates, key=lambda r: r.get("importance", 0))
+            osm_ids = f"{best['osm_type'][0].upper()}{best['osm_id']}"
+            response = await self._nominatim_get("/lookup",
+                                                 {"osm_ids": osm_ids, "format": "json", "polygon_geojson": 1})
+
+            if response.status_code != 200:
+                return None
+
+            results = _loads(response.content)
             for result in results:
                 geojson = result.get("geojson")
                 if not geojson:
@@ -71,12 +209,13 @@ class BoundaryService:
                     if geom_type == "Polygon":
                         coords = geojson["coordinates"][0]
                     else:
-                        coords = max(geojson["coordinates"], key=lambda p: len(p[0]))[0]
+                        ring_lens = [len(p[0]) for p in geojson["coordinates"]]
+                        coords = geojson["coordinates"][ring_lens.index(max(ring_lens))][0]
                     
-                    lons = [c[0] for c in coords]
-                    lats = [c[1] for c in coords]
-                    bbox = [min(lons), min(lats), max(lons), max(lats)]
-                    area_km2 = (max(lons) - min(lons)) * (max(lats) - min(lats)) * 111 * 111
+                    arr = np.asarray(coords, dtype=np.float64)
+                    (min_lon, min_lat), (max_lon, max_lat) = arr.min(axis=0), arr.max(axis=0)
+                    bbox = [float(min_lon), float(min_lat), float(max_lon), float(max_lat)]
+                    area_km2 = float((max_lon - min_lon) * (max_lat - min_lat) * _DEG2KM_SQ)
                     
                     return {
                         "name": city_name,
@@ -86,23 +225,28 @@ class BoundaryService:
                         "source": "Nominatim (Polygon)"
                     }
             return None
-        except:
+        except Exception:
             return None
     
     async def _fetch_nominatim_point_expanded(self, city_name: str, country: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Expand point to boundary"""
+        if not self._online:
+            return None
+        
         try:
             search_query = f"{city_name}, {country}" if country else city_name
             params = {"q": search_query, "format": "json", "limit": 1}
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.nominatim_url}/search", params=params,
-                                          headers={"User-Agent": "GeoWise-AI/1.0"})
+            response = await self._nominatim_get("/search", params)
+            
+            if response.status_code != 200:
+                return None
             
-            if response.status_code != 200 or not response.json():
+            data = _loads(response.content)
+            if not data:
                 return None
             
-            result = response.json()[0]
+            result = data[0]
             lat, lon = float(result["lat"]), float(result["lon"])
             city_type = result.get("type", "city")
             place_rank = result.get("place_rank", 16)
@@ -113,7 +257,7 @@ class BoundaryService:
             coords = [[bbox[0], bbox[1]], [bbox[2], bbox[1]], [bbox[2], bbox[3]],
                      [bbox[0], bbox[3]], [bbox[0], bbox[1]]]
             
-            area_km2 = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]) * 111 * 111
+            area_km2 = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]) * _DEG2KM_SQ
             
             return {
                 "name": city_name,
@@ -122,14 +266,14 @@ class BoundaryService:
                 "area_km2": round(area_km2, 2),
                 "source": f"Nominatim (Expanded {radius_km}km)"
             }
-        except:
+        except Exception:
             return None
     
-    def _calculate_expansion_radius(self, city_type: str, place_rank: int) -> float:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _calculate_expansion_radius(city_type: str, place_rank: int) -> float:
         """Calculate radius based on city type"""
-        type_radius = {"city": 15, "town": 8, "village": 3, "suburb": 5, 
-                      "municipality": 12, "administrative": 20}
-        base_radius = type_radius.get(city_type, 10)
+        base_radius = _TYPE_RADIUS.get(city_type, 10)
         
         if place_rank <= 8:
             return max(base_radius, 20)
@@ -140,30 +284,25 @@ class BoundaryService:
     
     def _expand_point_to_bbox(self, lat: float, lon: float, radius_km: float) -> List[float]:
         """Expand point to bbox"""
-        lat_offset = radius_km / 111.0
-        lon_offset = radius_km / (111.0 * math.cos(math.radians(lat)))
+        lat_offset = radius_km * _KM2DEG
+        lon_offset = radius_km * _KM2DEG / math.cos(math.radians(lat))
         return [lon - lon_offset, lat - lat_offset, lon + lon_offset, lat + lat_offset]
     
-    def _get_hardcoded_boundary(self, city_name: str) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _get_hardcoded_boundary(city_name: str) -> Optional[Dict[str, Any]]:
         """Hardcoded fallback"""
-        HARDCODED = {
-            "lahore": {
-                "coords": [[74.1847, 31.6340], [74.4462, 31.6217], [74.5051, 31.4732],
-                          [74.4380, 31.3204], [74.2431, 31.2641], [74.0847, 31.3455],
-                          [73.9993, 31.4903], [74.0993, 31.5903], [74.1847, 31.6340]],
-                "bbox": [73.9993, 31.2641, 74.5051, 31.6340],
-                "area": 1772.0
-            }
-        }
-        
-        data = HARDCODED.get(city_name.lower().strip())
+        data = _HARDCODED_BOUNDARIES.get(city_name.lower().strip())
         if not data:
             return None
         
+        # GeoJSON lists are only built here, once per city (lru_cache)
+        coords = np.column_stack([data["lons"], data["lats"]]).tolist()
+        
         return {
             "name": city_name,
-            "boundary": {"type": "Polygon", "coordinates": [data["coords"]]},
-            "bbox": data["bbox"],
+            "boundary": {"type": "Polygon", "coordinates": [coords]},
+            "bbox": data["bbox"].tolist(),
             "area_km2": data["area"],
             "source": "Hardcoded"
         }
@@ -190,25 +329,44 @@ async def main():
         ("São Paulo", "Brazil"),
     ]
     
-    results = {}
+    # The service spaces Nominatim requests itself; just cap cities in flight
+    sem = asyncio.Semaphore(2)
     
-    for city, country in cities:
-        print(f"\n{'='*60}")
-        print(f"Testing: {city}, {country}")
-        print('='*60)
+    async def bounded(city, country):
+        async with sem:
+            result = await service.get_city_boundary(city, country)
         
-        result = await service.get_city_boundary(city, country)
-        results[city] = result
+        # Each city's report is built in its own buffer and printed in one go
+        buf = io.StringIO()
+        buf.write(f"\n{'='*60}\n")
+        buf.write(f"Testing: {city}, {country}\n")
+        buf.write('='*60 + "\n")
         
         if result:
-            print(f"✅ SUCCESS")
-            print(f"   Area: {result['area_km2']:,.0f} km²")
-            print(f"   Points: {len(result['boundary']['coordinates'][0])}")
-            print(f"   Source: {result['source']}")
+            buf.write(f"✅ SUCCESS\n")
+            buf.write(f"   Area: {result['area_km2']:,.0f} km²\n")
+            buf.write(f"   Points: {len(result['boundary']['coordinates'][0])}\n")
+            buf.write(f"   Source: {result['source']}\n")
         else:
-            print(f"❌ FAILED")
+            buf.write(f"❌ FAILED\n")
         
-        await asyncio.sleep(1)
+        return city, result, buf.getvalue()
+    
+    try:
+        # One quick probe up front: if Nominatim is down every city goes
+        # straight to the hardcoded fallback instead of waiting out timeouts
+        if not await service.probe():
+            print("\n⚠️  Nominatim unreachable - using hardcoded boundaries only")
+        
+        pairs = await asyncio.gather(*(bounded(c, k) for c, k in cities))
+    finally:
+        await service.aclose()
+    
+    results = {}
+    
+    for city, result, report in pairs:
+        results[city] = result
+        print(report, end="")
     
     # Summary
     print("\n" + "="*60)
@@ -218,14 +376,12 @@ async def main():
     success_count = sum(1 for r in results.values() if r)
     print(f"\nSuccess Rate: {success_count}/{len(cities)} ({success_count/len(cities)*100:.0f}%)")
     
-    by_source = {}
-    for result in results.values():
-        if result:
-            source = result['source'].split('(')[0].strip()
-            by_source[source] = by_source.get(source, 0) + 1
+    by_source = Counter(
+        r['source'].split('(', 1)[0].strip() for r in results.values() if r
+    )
     
     print(f"\nBy Source:")
-    for source, count in sorted(by_source.items()):
+    for source, count in by_source.most_common():
         print(f"  {source}: {count}")
     
     if success_count == len(cities):
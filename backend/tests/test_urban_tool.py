@@ -1,10 +1,5 @@
 
 import asyncio
-import sys
-import os
-
-# Add backend to path
-sys.path.append(os.path.join(os.getcwd(), 'f:\\Geo_LLM\\geowise\\backend'))
 
 from app.llm.tools.urban_expansion_tool import analyze_urban_expansion
 
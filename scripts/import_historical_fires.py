@@ -4,22 +4,277 @@ Imports NASA FIRMS CSV files into GEOWISE database with metadata generation.
 """
 
 import asyncio
+import os
+import re
+import uuid
+import numpy as np
 import pandas as pd
 import json
 from pathlib import Path
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import sys
 sys.path.append(str(Path(__file__).parent.parent / "backend"))
 
-from app.database import init_db, close_db, get_db
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import init_db, close_db, get_db, database_manager
+from app.core.spatial import spatial_ops
 from app.models import FireDetection
 from app.utils.logger import get_logger
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
 logger = get_logger(__name__)
 
 
+# FIRMS numeric columns, coerced once per file (unparseable values -> NaN)
+NUMERIC_COLUMNS = ['latitude', 'longitude', 'brightness', 'frp', 'scan', 'track']
+
+# Measurement columns carried as float32 between parse and insert.
+# FIRMS publishes them with two decimals, so float32 loses nothing;
+# lat/lon stay float64 for the res-12 H3 cells
+MEASUREMENT_COLUMNS = ('brightness', 'frp', 'scan', 'track')
+MEASUREMENT_DECIMALS = 2
+
+# ISO code -> display name for metadata files
+COUNTRY_NAMES = MappingProxyType({
+    "PAK": "Pakistan",
+    "IDN": "Indonesia",
+    "BRA": "Brazil",
+    "IND": "India",
+    "USA": "United States",
+    "AUS": "Australia",
+    "MYS": "Malaysia",
+    "COD": "Democratic Republic of Congo"
+})
+
+# ISO code -> folder under data/fires/historical (lowercase for consistency)
+COUNTRY_FOLDERS = MappingProxyType({
+    "PAK": "pakistan",
+    "IDN": "indonesia",
+    "BRA": "brazil",
+    "IND": "india",
+    "USA": "usa",
+    "AUS": "australia",
+    "MYS": "malaysia",
+    "COD": "congo"
+})
+
+# Chunks parsed ahead of the DB writer per file (bounds memory)
+PARSE_AHEAD = 4
+
+# H3 resolutions stored on every FireDetection row
+H3_RESOLUTIONS = (12, 9, 6, 5)
+
+# Known FIRMS schema, so the CSV reader does no type inference
+if PYARROW_AVAILABLE:
+    FIRMS_COLUMN_TYPES = {
+        'latitude': pa.float64(),
+        'longitude': pa.float64(),
+        'brightness': pa.float32(),
+        'frp': pa.float32(),
+        'scan': pa.float32(),
+        'track': pa.float32(),
+        'confidence': pa.string(),
+        'acq_date': pa.timestamp('s'),
+        'acq_time': pa.string(),
+        'daynight': pa.string(),
+    }
+
+# Expected filename: {country}_fires_viirs_{satellite}_{year}.csv
+# Example: pak_fires_viirs_suomi_2020.csv
+_FIRE_FILENAME_RE = re.compile(
+    r'^(?P<country>[a-z]+)_fires_viirs_(?P<sat>[a-z0-9]+)_(?P<year>\d{4})$',
+    re.IGNORECASE,
+)
+
+
+# Column order of the rows built by _chunk_to_records
+INSERT_COLUMNS = (
+    'id', 'latitude', 'longitude', 'country',
+    'h3_index_12', 'h3_index_9', 'h3_index_6', 'h3_index_5',
+    'brightness', 'frp', 'confidence', 'scan', 'track',
+    'satellite', 'instrument', 'acq_date', 'year', 'acq_time', 'daynight',
+)
+
+# Positional (SQLite '?') INSERT matching INSERT_COLUMNS
+_INSERT_SQL = (
+    f"INSERT INTO fire_detections ({', '.join(INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(INSERT_COLUMNS))})"
+)
+
+# Per-connection SQLite settings for the bulk load: in-memory rollback
+# journal, no fsync, 256 MB page cache. Crash safety is traded for load
+# speed, but ROLLBACK still works so a failed chunk leaves no rows behind
+# (journal_mode=OFF would make it undefined)
+FASTLOAD_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA cache_size=-262144",
+)
+
+
+def _fastload_pragmas(dbapi_connection, connection_record):
+    """Engine 'connect' hook applying FASTLOAD_PRAGMAS to new connections."""
+    cursor = dbapi_connection.cursor()
+    for pragma in FASTLOAD_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def _create_fire_indexes(connection):
+    for index in FireDetection.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def _parse_filename(csv_file: Path) -> Optional[Dict]:
+    """Build a file_info dict from a FIRMS filename, or None if it doesn't match."""
+    m = _FIRE_FILENAME_RE.match(csv_file.stem)
+    if not m:
+        return None
+    return {
+        "path": csv_file,
+        "country": m['country'].upper(),
+        "satellite": m['sat'],
+        "year": int(m['year'])
+    }
+
+
+def _iter_firms_csv(csv_path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream a FIRMS CSV as DataFrame chunks of roughly `chunksize` rows.
+    
+    Uses pyarrow's streaming reader when available. If pyarrow hits a
+    value that doesn't fit the schema, the rest of the file is read with
+    pandas (where _chunk_to_records coerces bad values to NaN).
+    """
+    done = 0
+    
+    if PYARROW_AVAILABLE:
+        try:
+            reader = pa_csv.open_csv(
+                csv_path,
+                # FIRMS rows are ~100 bytes; size blocks to about chunksize rows
+                read_options=pa_csv.ReadOptions(block_size=chunksize * 128),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=FIRMS_COLUMN_TYPES,
+                    timestamp_parsers=['%Y-%m-%d', '%m/%d/%Y'],
+                ),
+            )
+            for batch in reader:
+                chunk = batch.to_pandas()
+                done += len(chunk)
+                yield chunk
+            return
+        except pa.ArrowInvalid as e:
+            logger.warning(f"  ⚠️  pyarrow could not parse {csv_path.name} ({e}); using pandas")
+    
+    # Skip whatever pyarrow already yielded (header row stays)
+    skip = range(1, done + 1) if done else None
+    yield from pd.read_csv(csv_path, chunksize=chunksize, skiprows=skip)
+
+
+def _vectorize_columns(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Columnar type coercion and cleanup for a chunk of FIRMS rows.
+    
+    Numeric/date columns are coerced (bad values -> NaN/NaT), rows missing
+    a required field are dropped, and text columns are normalized.
+    Returns (FireDetection-shaped DataFrame, number of rows dropped).
+    """
+    for col in NUMERIC_COLUMNS:
+        if col in df:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    # Handles MM/DD/YYYY as well as ISO dates from NASA
+    df['acq_date'] = pd.to_datetime(df['acq_date'], errors='coerce')
+    
+    # Rows missing a required field are dropped up front
+    valid = df[['latitude', 'longitude', 'brightness', 'acq_date']].notna().all(axis=1)
+    dropped = int((~valid).sum())
+    df = df[valid]
+    
+    out = pd.DataFrame({
+        'latitude': df['latitude'],
+        'longitude': df['longitude'],
+        'brightness': df['brightness'],
+        'frp': df['frp'],
+        'confidence': df['confidence'].astype('string').str.lower(),
+        'acq_date': df['acq_date'],
+        'year': df['acq_date'].dt.year,
+        'acq_time': df['acq_time'].astype('string').str.zfill(4) if 'acq_time' in df else None,
+        'daynight': df['daynight'].astype('string') if 'daynight' in df else None,
+        'scan': df['scan'] if 'scan' in df else None,
+        'track': df['track'] if 'track' in df else None,
+    })
+    return out, dropped
+
+
+def _chunk_to_records(df: pd.DataFrame, country: str, satellite: str) -> Tuple[np.ndarray, int]:
+    """
+    Convert FIRMS CSV rows to FireDetection insert rows, column-wise.
+    
+    Bulk inserts bypass FireDetection.__init__, so the id and H3 columns
+    are filled in here. Rows come back as a NumPy structured array in
+    INSERT_COLUMNS order (packed floats, no per-row dicts).
+    Returns (rows, number of invalid rows dropped).
+    """
+    out, dropped = _vectorize_columns(df)
+    out = out.assign(country=country, satellite=satellite.upper(), instrument='VIIRS')
+    
+    lats = out['latitude'].to_numpy(dtype=np.float64)
+    lons = out['longitude'].to_numpy(dtype=np.float64)
+    for res in H3_RESOLUTIONS:
+        out[f'h3_index_{res}'] = spatial_ops.lat_lon_to_h3_vec(lats, lons, res)
+    out['id'] = [str(uuid.uuid4()) for _ in range(len(out))]
+    
+    # Same text format SQLAlchemy's SQLite DateTime type writes
+    out['acq_date'] = out['acq_date'].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+    
+    # Text columns: NA -> None so the driver writes NULL.
+    # Float NaN is bound as NULL by SQLite itself
+    text_columns = [c for c in INSERT_COLUMNS if out[c].dtype.kind not in 'fi']
+    out[text_columns] = out[text_columns].astype(object).where(out[text_columns].notna(), None)
+    
+    rows = out[list(INSERT_COLUMNS)].to_records(
+        index=False,
+        column_dtypes={c: np.float32 for c in MEASUREMENT_COLUMNS},
+    )
+    return rows, dropped
+
+
+def _insert_params(rows: np.ndarray) -> List[tuple]:
+    """
+    Tuples for executemany from _chunk_to_records output.
+    
+    float32 measurements are widened and rounded back to their published
+    decimals, so 12.3 is stored as 12.3 and not 12.300000190734863.
+    """
+    wide = rows.astype([
+        (name, np.float64 if name in MEASUREMENT_COLUMNS else rows.dtype[name])
+        for name in rows.dtype.names
+    ])
+    for name in MEASUREMENT_COLUMNS:
+        wide[name] = wide[name].round(MEASUREMENT_DECIMALS)
+    return wide.tolist()
+
+
 class FireImporter:
     """Manages import of historical fire data from CSV files."""
     
@@ -31,6 +286,46 @@ class FireImporter:
             "total_errors": 0,
             "countries": {}
         }
+        # Serializes DB writes across concurrently imported files
+        self._write_lock = asyncio.Lock()
+        # Coercion + H3 indexing is CPU-bound; run it outside the GIL
+        self._pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        # Country folder -> CSV paths, filled by the first _scan_historical()
+        self._historical: Optional[Dict[str, List[Path]]] = None
+    
+    def close(self):
+        """Shut down the parse worker processes."""
+        self._pool.shutdown()
+    
+    def _scan_historical(self) -> Dict[str, List[Path]]:
+        """
+        Map lower-cased country folder name -> CSV paths in that folder.
+        
+        One os.scandir pass over data/fires/historical, cached on the
+        importer for the rest of the run.
+        """
+        if self._historical is not None:
+            return self._historical
+        
+        historical_dir = self.data_root / "fires" / "historical"
+        folders = {}
+        
+        if not historical_dir.is_dir():
+            self._historical = folders
+            return folders
+        
+        with os.scandir(historical_dir) as dirs:
+            for folder in dirs:
+                if not folder.is_dir():
+                    continue
+                with os.scandir(folder.path) as entries:
+                    folders[folder.name.lower()] = [
+                        Path(entry.path) for entry in entries
+                        if entry.name.endswith('.csv') and entry.is_file()
+                    ]
+        
+        self._historical = folders
+        return folders
     
     def discover_files(self, country: str = None) -> List[Dict]:
         """
@@ -47,54 +342,118 @@ class FireImporter:
             logger.error(f"Historical data directory not found: {historical_dir}")
             return []
         
-        files = []
-        pattern = f"{country}/" if country else "*/"
+        files = self._iter_file_infos(country.lower() if country else None)
+        return sorted(files, key=lambda x: (x['country'], x['year']))
+    
+    def _iter_file_infos(self, folder: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield parsed file_info dicts from the cached folder scan.
         
-        for csv_file in historical_dir.glob(f"{pattern}*.csv"):
-            # Remove .csv extension using .stem
-            filename_no_ext = csv_file.stem
-            
-            # Split by underscore
-            parts = filename_no_ext.split('_')
-            
-            logger.debug(f"Processing: {csv_file.name}")
-            logger.debug(f"  Stem: {filename_no_ext}")
-            logger.debug(f"  Parts: {parts}")
-            
-            # Expected format: {country}_fires_viirs_{satellite}_{year}
-            # Example: pak_fires_viirs_suomi_2020
-            if len(parts) >= 5:
-                try:
-                    # Extract year - remove any remaining .csv just in case
-                    year_part = parts[4].replace('.csv', '').strip()
-                    
-                    file_info = {
-                        "path": csv_file,
-                        "country": parts[0].upper(),
-                        "satellite": parts[3],
-                        "year": int(year_part)
-                    }
-                    files.append(file_info)
-                    logger.debug(f"  ✅ Parsed successfully: {file_info}")
-                    
-                except (ValueError, IndexError) as e:
-                    logger.warning(f"  ❌ Failed to parse {csv_file.name}: {e}")
+        Args:
+            folder: Lower-cased country folder name, or None for all folders
+        """
+        scanned = self._scan_historical()
+        folders = [folder] if folder else list(scanned)
+        
+        for name in folders:
+            for csv_file in scanned.get(name, []):
+                file_info = _parse_filename(csv_file)
+                
+                if file_info is None:
+                    logger.warning(f"  ⚠️  Invalid filename format: {csv_file.name}")
                     logger.warning(f"     Expected format: {{country}}_fires_viirs_{{satellite}}_{{year}}.csv")
                     continue
-            else:
-                logger.warning(f"  ⚠️  Invalid filename format: {csv_file.name}")
-                logger.warning(f"     Expected 5 parts (e.g., pak_fires_viirs_suomi_2020), got {len(parts)}")
+                
+                yield file_info
+    
+    async def _prepare_fastload(self):
+        """
+        Set up the database for a bulk load.
         
-        return sorted(files, key=lambda x: (x['country'], x['year']))
+        Drops the secondary indexes on fire_detections (rebuilt in one
+        pass by _finalize) and applies FASTLOAD_PRAGMAS to every
+        connection opened during the import.
+        """
+        engine = database_manager.engine
+        
+        event.listen(engine.sync_engine, "connect", _fastload_pragmas)
+        # Pooled connections predate the hook; make the import open new ones
+        await engine.dispose()
+        
+        async with engine.begin() as conn:
+            for index in FireDetection.__table__.indexes:
+                await conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        
+        logger.info("⚡ Fast-load mode: fire_detections indexes dropped")
+    
+    async def _finalize(self):
+        """Restore default connection settings and rebuild the indexes."""
+        engine = database_manager.engine
+        
+        if event.contains(engine.sync_engine, "connect", _fastload_pragmas):
+            event.remove(engine.sync_engine, "connect", _fastload_pragmas)
+        await engine.dispose()
+        
+        logger.info("🔨 Rebuilding fire_detections indexes...")
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_fire_indexes)
+        
+        logger.info("✅ Indexes rebuilt")
+    
+    @staticmethod
+    async def _driver_connection(session: AsyncSession):
+        """The DBAPI driver connection (aiosqlite) behind the session's transaction."""
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        return raw.driver_connection
+    
+    async def _parse_producer(self, csv_path: Path, batch_size: int, country: str,
+                              satellite: str, queue: asyncio.Queue):
+        """
+        Feed import_csv's queue with (rows read, pending parse) per chunk.
+        
+        The CSV is read in a thread (the reader is a stream); type coercion,
+        NaN filtering and H3 indexing are submitted to the process pool, so
+        several chunks are parsed while earlier ones are written. Ends
+        with None, or with the exception that stopped it.
+        """
+        loop = asyncio.get_running_loop()
+        reader = _iter_firms_csv(csv_path, batch_size)
+        
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, reader, None)
+                if chunk is None:
+                    break
+                parsed = loop.run_in_executor(
+                    self._pool, _chunk_to_records, chunk, country, satellite
+                )
+                try:
+                    await queue.put((len(chunk), parsed))
+                except asyncio.CancelledError:
+                    # Never made it onto the queue, so nobody else will cancel it
+                    parsed.cancel()
+                    raise
+        except Exception as e:
+            await queue.put(e)
+            return
+        
+        await queue.put(None)
     
-    async def import_csv(self, file_info: Dict, batch_size: int = 1000) -> Dict:
+    async def import_csv(self, file_info: Dict, session: AsyncSession,
+                         batch_size: int = 10000, progress=None) -> Dict:
         """
-        Import a single CSV file.
+        Import a single CSV file through the given session.
+        
+        The session may be shared by concurrently running imports: it is
+        only used while holding self._write_lock. Rows read are reported
+        to the `progress` bar if given, else logged per chunk.
         
         FEATURES:
-        - Batch processing (1000 records at a time)
+        - Streams the CSV in chunks (10,000 rows at a time), so memory
+          stays bounded by the chunk size, not the file size
         - Progress tracking
-        - Error logging
+        - Error counting (invalid rows are dropped per chunk)
         - Automatic date conversion
         """
         csv_path = file_info['path']
@@ -105,55 +464,66 @@ class FireImporter:
         logger.info(f"Importing: {csv_path.name}")
         
         try:
-            # Read CSV
-            logger.info(f"  📖 Reading CSV file...")
-            df = pd.read_csv(csv_path)
-            
-            # Convert date format (handles MM/DD/YYYY format from NASA)
-            logger.info(f"  📅 Converting date format...")
-            df['acq_date'] = pd.to_datetime(df['acq_date'])
+            logger.info(f"  📖 Streaming CSV file...")
             
-            total = len(df)
+            total = 0
             imported = 0
             errors = 0
             
-            logger.info(f"  📊 Records to import: {total:,}")
+            # Parsing runs ahead of the writes by up to PARSE_AHEAD chunks
+            queue = asyncio.Queue(maxsize=PARSE_AHEAD)
+            producer = asyncio.create_task(
+                self._parse_producer(csv_path, batch_size, country, satellite, queue)
+            )
             
-            async for session in get_db():
-                for idx, row in df.iterrows():
-                    try:
-                        fire = FireDetection(
-                            latitude=float(row['latitude']),
-                            longitude=float(row['longitude']),
-                            country=country,
-                            brightness=float(row['brightness']),
-                            frp=float(row['frp']) if pd.notna(row['frp']) else None,
-                            confidence=str(row['confidence']).lower() if pd.notna(row['confidence']) else None,
-                            acq_date=row['acq_date'],
-                            acq_time=str(row['acq_time']).zfill(4) if 'acq_time' in row else None,
-                            satellite=satellite.upper(),
-                            instrument='VIIRS',
-                            daynight=str(row['daynight']) if 'daynight' in row else None,
-                            scan=float(row['scan']) if 'scan' in row and pd.notna(row['scan']) else None,
-                            track=float(row['track']) if 'track' in row and pd.notna(row['track']) else None
-                        )
-                        
-                        session.add(fire)
-                        imported += 1
-                        
-                        # Commit in batches
-                        if imported % batch_size == 0:
-                            await session.commit()
-                            progress = (imported / total) * 100
-                            logger.info(f"  💾 Progress: {imported:,}/{total:,} ({progress:.1f}%)")
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    
+                    rows_read, parsed = item
+                    records, dropped = await parsed
+                    total += rows_read
+                    errors += dropped
+                    
+                    if len(records):
+                        # SQLite has a single writer: one chunk transaction at a time
+                        async with self._write_lock:
+                            try:
+                                # Positional executemany on the raw aiosqlite
+                                # connection: no per-row dicts, no SQLAlchemy
+                                # statement handling. sqlite3 keeps the prepared
+                                # _INSERT_SQL in its per-connection statement cache
+                                driver = await self._driver_connection(session)
+                                await driver.executemany(_INSERT_SQL, _insert_params(records))
+                                await session.commit()
+                            except Exception:
+                                # Leave the shared session usable for other files
+                                await session.rollback()
+                                raise
+                            session.expunge_all()
+                        imported += len(records)
                     
-                    except Exception as e:
-                        errors += 1
-                        if errors <= 3:  # Log first 3 errors only
-                            logger.error(f"  ❌ Error at row {idx}: {e}")
+                    if progress is not None:
+                        progress.update(rows_read)
+                    else:
+                        logger.info(f"  💾 {csv_path.name}: {imported:,} imported ({total:,} rows read)")
+            finally:
+                # Stop the producer first so nothing more is queued, then
+                # cancel and reap the parses still waiting in the queue
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
                 
-                # Final commit
-                await session.commit()
+                pending = []
+                while not queue.empty():
+                    item = queue.get_nowait()
+                    if isinstance(item, tuple):
+                        item[1].cancel()
+                        pending.append(item[1])
+                await asyncio.gather(*pending, return_exceptions=True)
             
             logger.info(f"  ✅ Import complete: {imported:,} imported, {errors:,} errors")
             
@@ -191,9 +561,7 @@ class FireImporter:
         
         try:
             async for session in get_db():
-                from sqlalchemy import text
-                
-                # Get summary stats using raw SQL
+                # Summary stats and the list of years in one round trip
                 result = await session.execute(
                     text("""
                         SELECT 
@@ -201,74 +569,108 @@ class FireImporter:
                             MIN(acq_date) as start_date,
                             MAX(acq_date) as end_date,
                             AVG(frp) as avg_frp,
-                            COUNT(DISTINCT satellite) as satellites
+                            COUNT(DISTINCT satellite) as satellites,
+                            GROUP_CONCAT(DISTINCT year) as years
                         FROM fire_detections
                         WHERE country = :country
                     """),
                     {"country": country}
                 )
-                stats = result.fetchone()
+                stats = result.first()
                 
                 if not stats or stats[0] == 0:
                     logger.warning(f"No data found for {country}")
                     return
                 
-                # Get years available
-                years_result = await session.execute(
+                metadata = self._build_metadata(country, stats)
+                self._write_metadata(metadata_dir, metadata)
+                return metadata
+                
+        except Exception as e:
+            logger.error(f"Failed to generate metadata for {country}: {e}")
+            import traceback
+            traceback.print_exc()
+    
+    async def generate_all_metadata(self, countries: List[str]):
+        """
+        Generate metadata JSON for several countries from one table scan.
+        
+        Same output as generate_metadata, but one GROUP BY country query
+        instead of a query per country.
+        """
+        metadata_dir = self.data_root / "fires" / "metadata"
+        metadata_dir.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            async for session in get_db():
+                result = await session.execute(
                     text("""
-                        SELECT DISTINCT strftime('%Y', acq_date) as year
+                        SELECT 
+                            country,
+                            COUNT(*) as total_fires,
+                            MIN(acq_date) as start_date,
+                            MAX(acq_date) as end_date,
+                            AVG(frp) as avg_frp,
+                            COUNT(DISTINCT satellite) as satellites,
+                            GROUP_CONCAT(DISTINCT year) as years
                         FROM fire_detections
-                        WHERE country = :country
-                        ORDER BY year
-                    """),
-                    {"country": country}
+                        WHERE country IN :countries
+                        GROUP BY country
+                    """).bindparams(bindparam("countries", expanding=True)),
+                    {"countries": list(countries)}
                 )
-                years = [int(row[0]) for row in years_result.fetchall()]
+                found = {row[0]: self._build_metadata(row[0], row[1:]) for row in result}
                 
-                metadata = {
-                    "country": country,
-                    "country_name": self._get_country_name(country),
-                    "data_summary": {
-                        "total_fires": int(stats[0]),
-                        "date_range": {
-                            "start": str(stats[1]),
-                            "end": str(stats[2])
-                        },
-                        "years_available": years,
-                        "avg_frp": round(float(stats[3]), 2) if stats[3] else None,
-                        "satellites": int(stats[4])
-                    },
-                    "last_updated": datetime.now().isoformat(),
-                    "data_sources": ["NASA FIRMS VIIRS"],
-                    "resolution": "375m"
-                }
+                for country in countries:
+                    if country not in found:
+                        logger.warning(f"No data found for {country}")
                 
-                # Save metadata
-                metadata_file = metadata_dir / f"{country.lower()}.json"
-                with open(metadata_file, 'w') as f:
-                    json.dump(metadata, f, indent=2)
-                
-                logger.info(f"✅ Generated metadata: {metadata_file}")
-                return metadata
+                # JSON files are written in parallel off the event loop
+                await asyncio.gather(*(
+                    asyncio.to_thread(self._write_metadata, metadata_dir, metadata)
+                    for metadata in found.values()
+                ))
+                return found
                 
         except Exception as e:
-            logger.error(f"Failed to generate metadata for {country}: {e}")
+            logger.error(f"Failed to generate metadata: {e}")
             import traceback
             traceback.print_exc()
     
+    def _build_metadata(self, country: str, stats) -> Dict:
+        """Metadata dict from a (total, start, end, avg_frp, satellites, years) row."""
+        years = sorted({int(y) for y in stats[5].split(',')}) if stats[5] else []
+        
+        return {
+            "country": country,
+            "country_name": self._get_country_name(country),
+            "data_summary": {
+                "total_fires": int(stats[0]),
+                "date_range": {
+                    "start": str(stats[1]),
+                    "end": str(stats[2])
+                },
+                "years_available": years,
+                "avg_frp": round(float(stats[3]), 2) if stats[3] else None,
+                "satellites": int(stats[4])
+            },
+            "last_updated": datetime.now().isoformat(),
+            "data_sources": ["NASA FIRMS VIIRS"],
+            "resolution": "375m"
+        }
+    
+    @staticmethod
+    def _write_metadata(metadata_dir: Path, metadata: Dict):
+        """Save metadata to data/fires/metadata/{country}.json"""
+        metadata_file = metadata_dir / f"{metadata['country'].lower()}.json"
+        with open(metadata_file, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        
+        logger.info(f"✅ Generated metadata: {metadata_file}")
+    
     def _get_country_name(self, code: str) -> str:
         """Get country name from ISO code."""
-        countries = {
-            "PAK": "Pakistan",
-            "IDN": "Indonesia",
-            "BRA": "Brazil",
-            "IND": "India",
-            "USA": "United States",
-            "AUS": "Australia",
-            "MYS": "Malaysia",
-            "COD": "Democratic Republic of Congo"
-        }
-        return countries.get(code, code)
+        return COUNTRY_NAMES.get(code, code)
     
     async def import_country(self, country: str):
         """
@@ -280,64 +682,27 @@ class FireImporter:
         logger.info(f"IMPORTING: {country}")
         logger.info(f"{'='*60}")
         
-        # Map country codes to folder names (lowercase for consistency)
-        country_folders = {
-            "PAK": "pakistan",
-            "IDN": "indonesia",
-            "BRA": "brazil",
-            "IND": "india",
-            "USA": "usa",
-            "AUS": "australia",
-            "MYS": "malaysia",
-            "COD": "congo"
-        }
-        
-        folder_name = country_folders.get(country, country.lower())
+        folder_name = COUNTRY_FOLDERS.get(country, country.lower())
         historical_dir = self.data_root / "fires" / "historical"
         
-        # Try to find folder (case-insensitive)
-        country_dir = None
-        if historical_dir.exists():
-            for potential_dir in historical_dir.iterdir():
-                if potential_dir.is_dir() and potential_dir.name.lower() == folder_name:
-                    country_dir = potential_dir
-                    break
+        # Case-insensitive folder lookup against the cached scan
+        csv_files = self._scan_historical().get(folder_name)
         
-        if not country_dir or not country_dir.exists():
+        if csv_files is None:
             logger.warning(f"Country directory not found: {folder_name}")
             logger.warning(f"  Looked in: {historical_dir}")
             logger.warning(f"  Expected folder: {folder_name} (case-insensitive)")
             return
         
-        # Find all CSV files in country directory
-        csv_files = list(country_dir.glob("*.csv"))
-        
         if not csv_files:
-            logger.warning(f"No CSV files found in: {country_dir}")
+            logger.warning(f"No CSV files found in: {historical_dir / folder_name}")
             return
         
-        logger.info(f"Found {len(csv_files)} file(s) in {country_dir.name}:")
+        logger.info(f"Found {len(csv_files)} file(s) in {folder_name}:")
         
-        # Parse file info
-        files = []
-        for csv_file in csv_files:
-            filename_no_ext = csv_file.stem
-            parts = filename_no_ext.split('_')
-            
-            if len(parts) >= 5:
-                try:
-                    year_part = parts[4].replace('.csv', '').strip()
-                    
-                    file_info = {
-                        "path": csv_file,
-                        "country": parts[0].upper(),
-                        "satellite": parts[3],
-                        "year": int(year_part)
-                    }
-                    files.append(file_info)
-                    logger.info(f"  - {csv_file.name} ({file_info['year']}, {file_info['satellite']})")
-                except (ValueError, IndexError) as e:
-                    logger.warning(f"  ⚠️  Skipping invalid filename: {csv_file.name}")
+        files = list(self._iter_file_infos(folder_name))
+        for file_info in files:
+            logger.info(f"  - {file_info['path'].name} ({file_info['year']}, {file_info['satellite']})")
         
         if not files:
             logger.warning(f"No valid fire data files found")
@@ -345,9 +710,27 @@ class FireImporter:
         
         country_stats = {"imported": 0, "errors": 0, "files": []}
         
-        # Import each file
-        for file_info in sorted(files, key=lambda x: x['year']):
-            result = await self.import_csv(file_info)
+        # Import files concurrently; parsing of one overlaps writes of another.
+        # Writes are serialized, so the files share one session/connection
+        sem = asyncio.Semaphore(4)
+        
+        # One progress bar for all of the country's files
+        progress = tqdm(desc=country, unit='rows', unit_scale=True) if TQDM_AVAILABLE else None
+        
+        async with database_manager.async_session_maker() as session:
+            async def bounded(file_info: Dict) -> Dict:
+                async with sem:
+                    return await self.import_csv(file_info, session, progress=progress)
+            
+            try:
+                results = await asyncio.gather(
+                    *(bounded(f) for f in sorted(files, key=lambda x: x['year']))
+                )
+            finally:
+                if progress is not None:
+                    progress.close()
+        
+        for result in results:
             country_stats["imported"] += result.get("imported", 0)
             country_stats["errors"] += result.get("errors", 0)
             country_stats["files"].append(result)
@@ -357,10 +740,6 @@ class FireImporter:
         self.stats["total_imported"] += country_stats["imported"]
         self.stats["total_errors"] += country_stats["errors"]
         
-        # Generate metadata
-        logger.info(f"\n📊 Generating metadata for {country}...")
-        await self.generate_metadata(country)
-        
         logger.info(f"\n✅ {country} import complete:")
         logger.info(f"   Files: {len(files)}")
         logger.info(f"   Imported: {country_stats['imported']:,}")
@@ -403,11 +782,8 @@ async def main():
         print("\n❌ No CSV files found in data/fires/historical/")
         print("   Expected structure: data/fires/historical/{country}/{country}_fires_*.csv")
         print(f"\n   Checking directories:")
-        if historical_dir.exists():
-            for subdir in historical_dir.iterdir():
-                if subdir.is_dir():
-                    csv_count = len(list(subdir.glob("*.csv")))
-                    print(f"   - {subdir.name}: {csv_count} CSV file(s)")
+        for folder, csv_files in importer._scan_historical().items():
+            print(f"   - {folder}: {len(csv_files)} CSV file(s)")
         return
     
     # Show discovered files
@@ -431,9 +807,18 @@ async def main():
     print("\n🔧 Initializing database...")
     await init_db()
     
-    # Import each country
-    for country in sorted(countries):
-        await importer.import_country(country)
+    # Import each country (indexes are rebuilt once, after the load)
+    await importer._prepare_fastload()
+    try:
+        for country in sorted(countries):
+            await importer.import_country(country)
+    finally:
+        importer.close()
+        await importer._finalize()
+    
+    # Metadata for every country in one pass over the table
+    print("\n📊 Generating metadata...")
+    await importer.generate_all_metadata(sorted(countries))
     
     # Final summary
     print("\n" + "="*60)